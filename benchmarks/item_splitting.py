@@ -0,0 +1,74 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Iterable, TextIO
+
+from common.item_splitter import split_text_stream, split_file
+
+MB = 1 << 20
+
+
+def _write_ranges_file(path: str, size_bytes: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w') as f:
+        while written < size_bytes:
+            items = []
+            for _ in range(1000):
+                lo = rng.randrange(1, 10 ** 10)
+                items.append(f'{lo}-{lo + rng.randrange(10 ** 6)}')
+            chunk = ','.join(items) + ','
+            f.write(chunk)
+            written += len(chunk)
+        f.write('1-2\n')
+
+
+def _split_by_reslicing(file: TextIO, delimiter: str, chunk_size: int = 256) -> Iterable[str]:
+    # The original implementation, kept around to compare against
+    buffer = ""
+    while chunk := file.read(chunk_size):
+        buffer += chunk
+        while (pos := buffer.find(delimiter)) != -1:
+            yield buffer[:pos]
+            buffer = buffer[pos + len(delimiter):]
+    if buffer:
+        yield buffer
+
+
+SPLITTERS: dict[str, Callable[[TextIO, str], Iterable[str]]] = {
+    'chunked': lambda f, delimiter: split_text_stream(f, delimiter),
+    'mmap': lambda f, delimiter: split_file(f, delimiter),
+    'reslicing': _split_by_reslicing,
+}
+
+
+def _time_splitter(path: str, splitter: Callable[[TextIO, str], Iterable[str]]) -> tuple[int, float]:
+    start_time = time.perf_counter()
+    with open(path, 'r') as f:
+        item_count = sum(1 for _ in splitter(f, ','))
+    return item_count, time.perf_counter() - start_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measures per-item cost of splitting comma separated ranges')
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[1, 10, 100, 1024])
+    parser.add_argument('--splitters', nargs='+', default=['chunked', 'mmap'], choices=sorted(SPLITTERS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(tmp_dir, f'ranges_{size_mb}mb.txt')
+            _write_ranges_file(path, size_mb * MB)
+            for name in args.splitters:
+                item_count, elapsed = _time_splitter(path, SPLITTERS[name])
+                print(
+                    f'{size_mb:>6d} MB  {name:<10s} items={item_count:<12d} '
+                    f'total={elapsed:0.2f}s  per_item={elapsed / item_count * 1e9:0.1f}ns'
+                )
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import gzip
+import os
+import random
+import tempfile
+from typing import Callable
+
+from common.streaming_solver import StreamingSolver, create_summing_solution
+
+PARSERS: dict[str, Callable[[str], list[int]]] = {
+    # Barely any work per item, so shipping parsed items to another process costs about as much as parsing them
+    'cheap': lambda item_str: [int(value) for value in item_str.split(',')],
+    # About as much pure python work per item as the solution does, the best case for overlapping the two
+    'heavy': lambda item_str: sorted(int(value) * 7919 % 1000003 for value in item_str.split(',') for _ in range(2)),
+}
+
+
+def _process_item(item: list[int]) -> int:
+    return sum(value * value for value in item) % 1000003
+
+
+def _write_items_file(path: str, item_count: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with (gzip.open(path, 'wt') if path.endswith('.gz') else open(path, 'w')) as f:
+        for _ in range(item_count):
+            f.write(','.join(str(rng.randrange(10 ** 6)) for _ in range(10)) + '\n')
+
+
+def _time_solver(path: str, parser: Callable[[str], list[int]], **options: object) -> tuple[int, float]:
+    solver = StreamingSolver[list[int], None](
+        file_names=[path],
+        item_parser=parser,
+        solutions=[create_summing_solution(_process_item)],
+        log_func=lambda _: None,
+        **options,
+    )
+    stats = solver.solve_file(path)
+    return stats.item_count, stats.wall_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compares pipelined parsing against parsing and solving serially')
+    parser.add_argument('--items', type=int, default=200_000)
+    parser.add_argument('--parsers', nargs='+', default=sorted(PARSERS), choices=sorted(PARSERS))
+    parser.add_argument('--queue-size', type=int, default=8)
+    args = parser.parse_args()
+
+    modes: dict[str, dict[str, object]] = {
+        'serial': {},
+        'thread': {'pipeline_queue_size': args.queue_size, 'pipeline_mode': 'thread'},
+        'process': {'pipeline_queue_size': args.queue_size, 'pipeline_mode': 'process'},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_name in ('items.txt', 'items.txt.gz'):
+            path = os.path.join(tmp_dir, file_name)
+            _write_items_file(path, args.items)
+            for parser_name in args.parsers:
+                serial_time = None
+                for mode, options in modes.items():
+                    item_count, elapsed = _time_solver(path, PARSERS[parser_name], **options)
+                    serial_time = serial_time or elapsed
+                    print(
+                        f'{file_name:<14s} {parser_name:<6s} {mode:<8s} items={item_count:<10d} '
+                        f'total={elapsed:0.2f}s  speedup={serial_time / elapsed:0.2f}x'
+                    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import json
+import sys
+
+from common.scaling import DEFAULT_EXPONENT_TOLERANCE, sweep, curves_to_json, find_scaling_regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measures how a day's solutions scale on generated inputs")
+    parser.add_argument('--day', type=int, required=True)
+    parser.add_argument('--sizes', type=int, nargs='+', help="defaults to the day's SCALING_SIZES")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trace-memory', action='store_true')
+    parser.add_argument('--output', help='write the curves as JSON to this path')
+    parser.add_argument('--baseline', help='JSON curves of an earlier run to compare exponents against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_EXPONENT_TOLERANCE)
+    args = parser.parse_args()
+
+    curves, errors = sweep(args.day, args.sizes, args.repeat, args.trace_memory, args.seed)
+    for curve in curves:
+        for line in curve.format_lines():
+            print(line)
+    for error in errors:
+        print(f'FAILED {error}')
+
+    results = curves_to_json(curves)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = find_scaling_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'{"REGRESSION" if baseline is not None else "SUPER-LINEAR"}: {regression}')
+    if baseline is not None and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
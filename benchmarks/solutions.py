@@ -0,0 +1,49 @@
+import argparse
+import json
+import sys
+
+from common.benchmark import BenchmarkConfig, DEFAULT_REGRESSION_THRESHOLD, find_regressions, benchmark_days
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks each day's solutions")
+    parser.add_argument('--days', type=int, nargs='+', default=list(range(1, 13)))
+    parser.add_argument('--warmup', type=int, default=BenchmarkConfig.warmup)
+    parser.add_argument('--repeat', type=int, default=BenchmarkConfig.repeat)
+    parser.add_argument('--trace-memory', action='store_true')
+    parser.add_argument('--files', default=BenchmarkConfig.file_pattern, help='glob of input file names to run')
+    parser.add_argument('--output', help='write the results as JSON to this path')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to check for regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    session, errors = benchmark_days(
+        args.days,
+        BenchmarkConfig(
+            warmup=args.warmup,
+            repeat=args.repeat,
+            trace_memory=args.trace_memory,
+            file_pattern=args.files,
+        ),
+    )
+    for line in session.format_lines():
+        print(line)
+    for error in errors:
+        print(f'FAILED {error}')
+
+    results = session.to_json()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION: {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
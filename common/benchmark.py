@@ -0,0 +1,312 @@
+import contextlib
+import dataclasses
+import fnmatch
+import io
+import math
+import os
+import runpy
+import time
+from typing import Callable, Any, Optional, Sequence, TypeVar, Iterator
+
+from common.construct_dir import day_directory, running_in
+from common.lazy_import import lazy_import
+from common.solver_stats import StreamingStats
+
+statistics = lazy_import('statistics')
+tracemalloc = lazy_import('tracemalloc')
+
+T = TypeVar('T')
+
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+
+
+@dataclasses.dataclass
+class BenchmarkConfig:
+    warmup: int = 1
+    repeat: int = 5
+    # Runs everything once more under tracemalloc to measure peak memory, which is kept out of the timings
+    trace_memory: bool = False
+    # Only input files whose name matches this glob are benchmarked
+    file_pattern: str = '*'
+
+
+@dataclasses.dataclass
+class TimingSummary:
+    min: float
+    median: float
+    p95: float
+    stddev: float
+    samples: int
+
+    @classmethod
+    def from_samples(cls, samples: Sequence[float]) -> 'TimingSummary':
+        ordered = sorted(samples)
+        return cls(
+            min=ordered[0],
+            median=statistics.median(ordered),
+            # Nearest rank, so with few samples this is simply the slowest one
+            p95=ordered[math.ceil(0.95 * len(ordered)) - 1],
+            stddev=statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+            samples=len(ordered),
+        )
+
+    def format(self) -> str:
+        return (
+            f'min {self.min * 1e3:9.3f}ms  median {self.median * 1e3:9.3f}ms  '
+            f'p95 {self.p95 * 1e3:9.3f}ms  stddev {self.stddev * 1e3:8.3f}ms'
+        )
+
+
+@dataclasses.dataclass
+class SolutionBenchmark:
+    name: str
+    timing: TimingSummary
+    result: str
+    peak_memory_bytes: Optional[int] = None
+
+
+@dataclasses.dataclass
+class FileBenchmark:
+    file_name: str
+    load: TimingSummary
+    total: TimingSummary
+    solutions: list[SolutionBenchmark]
+    peak_memory_bytes: Optional[int] = None
+
+
+class BenchmarkSession:
+    """
+    While a session is active, FileSolver and StreamingSolver hand each input file to it instead of solving it
+    once, and it repeatedly solves the file to collect timings.
+
+    FileSolver solutions each get freshly loaded data on every run, so solutions that mutate their input are still
+    timed on the same data every time. For StreamingSolver the load time is the time spent parsing (and
+    decompressing) items, and each solution's time is the time spent in its process_item/process_batch calls.
+    """
+    def __init__(self, config: BenchmarkConfig, input_overrides: Optional[dict[str, str]] = None) -> None:
+        self.config = config
+        # Input file name -> path of the file to benchmark in its place, e.g. a generated input
+        self.input_overrides = input_overrides or {}
+        # Prefixed onto the keys of the results, e.g. with the name of the day being benchmarked
+        self.label = ''
+        self.results: dict[str, FileBenchmark] = {}
+        self.missing_files: list[str] = []
+
+    def __enter__(self) -> 'BenchmarkSession':
+        global _active_session
+        if _active_session is not None:
+            raise RuntimeError('A benchmark session is already active')
+        _active_session = self
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _active_session
+        _active_session = None
+
+    def resolve_input(self, file_name: str) -> str:
+        return self.input_overrides.get(os.path.basename(file_name), file_name)
+
+    def benchmark_file_solver(
+        self,
+        file_name: str,
+        load: Callable[[], T],
+        solutions: list[Callable[[T], str | int]],
+    ) -> Optional[FileBenchmark]:
+        if not self._should_benchmark(file_name):
+            return None
+
+        load_samples = []
+        total_samples = []
+        solution_samples: list[list[float]] = [[] for _ in solutions]
+        results: list[Any] = [None] * len(solutions)
+        for run in range(self.config.warmup + self.config.repeat):
+            run_total = 0.0
+            for i, solution in enumerate(solutions):
+                start_time = time.perf_counter()
+                data = load()
+                loaded_time = time.perf_counter()
+                results[i] = solution(data)
+                end_time = time.perf_counter()
+
+                run_total += end_time - start_time
+                if run >= self.config.warmup:
+                    load_samples.append(loaded_time - start_time)
+                    solution_samples[i].append(end_time - loaded_time)
+            if run >= self.config.warmup:
+                total_samples.append(run_total)
+
+        benchmark = FileBenchmark(
+            file_name=file_name,
+            load=TimingSummary.from_samples(load_samples),
+            total=TimingSummary.from_samples(total_samples),
+            solutions=[
+                SolutionBenchmark(solution.__name__, TimingSummary.from_samples(samples), str(result))
+                for solution, samples, result in zip(solutions, solution_samples, results)
+            ],
+        )
+        if self.config.trace_memory:
+            # The file's peak is loading alone, each solution's includes loading the data it solves
+            benchmark.peak_memory_bytes, _ = _measure_peak_memory(load)
+            for solution_benchmark, solution in zip(benchmark.solutions, solutions):
+                solution_benchmark.peak_memory_bytes, _ = _measure_peak_memory(lambda: solution(load()))
+
+        self._add_result(benchmark)
+        return benchmark
+
+    def benchmark_streaming_solver(
+        self,
+        file_name: str,
+        solve: Callable[[], tuple[list[Any], StreamingStats]],
+    ) -> Optional[StreamingStats]:
+        if not self._should_benchmark(file_name):
+            return None
+
+        runs = []
+        for run in range(self.config.warmup + self.config.repeat):
+            solutions, stats = solve()
+            if run >= self.config.warmup:
+                runs.append(stats)
+
+        benchmark = FileBenchmark(
+            file_name=file_name,
+            load=TimingSummary.from_samples([
+                stats.parse_time + (stats.decompression.decompress_time if stats.decompression else 0.0)
+                for stats in runs
+            ]),
+            total=TimingSummary.from_samples([stats.wall_time for stats in runs]),
+            solutions=[
+                SolutionBenchmark(
+                    name,
+                    TimingSummary.from_samples([stats.process_times[i] for stats in runs]),
+                    str(solution.result()),
+                )
+                for i, (name, solution) in enumerate(zip(runs[-1].solution_names, solutions))
+            ],
+        )
+        if self.config.trace_memory:
+            benchmark.peak_memory_bytes, _ = _measure_peak_memory(solve)
+
+        self._add_result(benchmark)
+        return runs[-1]
+
+    def _should_benchmark(self, file_name: str) -> bool:
+        if not fnmatch.fnmatch(os.path.basename(file_name), self.config.file_pattern):
+            return False
+        if not os.path.exists(file_name):
+            self.missing_files.append(self._key_for(file_name))
+            return False
+        return True
+
+    def _key_for(self, file_name: str) -> str:
+        return f'{self.label}/{os.path.basename(file_name)}' if self.label else file_name
+
+    def _add_result(self, benchmark: FileBenchmark) -> None:
+        # Days that solve the same file more than once (e.g. with different loaders) get numbered keys
+        key = base_key = self._key_for(benchmark.file_name)
+        run_number = 1
+        while key in self.results:
+            run_number += 1
+            key = f'{base_key}#{run_number}'
+        self.results[key] = benchmark
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            'config': dataclasses.asdict(self.config),
+            'files': {key: dataclasses.asdict(benchmark) for key, benchmark in self.results.items()},
+        }
+
+    def format_lines(self) -> Iterator[str]:
+        for key, benchmark in self.results.items():
+            memory_note = (
+                f' (peak memory {benchmark.peak_memory_bytes / 1024:0.1f}KB)'
+                if benchmark.peak_memory_bytes is not None
+                else ''
+            )
+            yield f'{key}{memory_note}:'
+            yield f'\t{"load":<24s} {benchmark.load.format()}'
+            for solution in benchmark.solutions:
+                memory_note = (
+                    f'  peak {solution.peak_memory_bytes / 1024:0.1f}KB'
+                    if solution.peak_memory_bytes is not None
+                    else ''
+                )
+                yield f'\t{solution.name:<24s} {solution.timing.format()}{memory_note}'
+            yield f'\t{"total":<24s} {benchmark.total.format()}'
+        for key in self.missing_files:
+            yield f'{key}: skipped, file not found'
+
+
+_active_session: Optional[BenchmarkSession] = None
+
+
+def active_benchmark_session() -> Optional[BenchmarkSession]:
+    return _active_session
+
+
+def _measure_peak_memory(func: Callable[[], T]) -> tuple[int, T]:
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+def find_regressions(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> list[str]:
+    """
+    Compares two results of BenchmarkSession.to_json, returning a description of each median time that grew by
+    more than threshold (as a fraction) and each result that changed
+    """
+    regressions = []
+    for key, current_file in current['files'].items():
+        baseline_file = baseline['files'].get(key)
+        if baseline_file is None:
+            continue
+
+        timings = [('load', current_file['load'], baseline_file['load'])]
+        baseline_solutions = {solution['name']: solution for solution in baseline_file['solutions']}
+        for solution in current_file['solutions']:
+            baseline_solution = baseline_solutions.get(solution['name'])
+            if baseline_solution is None:
+                continue
+            timings.append((solution['name'], solution['timing'], baseline_solution['timing']))
+            if solution['result'] != baseline_solution['result']:
+                regressions.append(
+                    f'{key} {solution["name"]}: result changed from {baseline_solution["result"]} '
+                    f'to {solution["result"]}'
+                )
+
+        for name, timing, baseline_timing in timings:
+            if baseline_timing['median'] and timing['median'] > baseline_timing['median'] * (1 + threshold):
+                regressions.append(
+                    f'{key} {name}: median {baseline_timing["median"] * 1e3:0.3f}ms -> '
+                    f'{timing["median"] * 1e3:0.3f}ms (+{timing["median"] / baseline_timing["median"] - 1:0.0%})'
+                )
+    return regressions
+
+
+def benchmark_days(
+    day_numbers: Sequence[int],
+    config: BenchmarkConfig,
+    input_overrides: Optional[dict[str, str]] = None,
+) -> tuple[BenchmarkSession, list[str]]:
+    """
+    Runs each day's entry point (its `if __name__ == "__main__"` block) inside a benchmark session, with the
+    solvers' own output suppressed. Returns the session and a description of each day that failed.
+    """
+    errors = []
+    with BenchmarkSession(config, input_overrides) as session:
+        for day_number in day_numbers:
+            day_dir = day_directory(day_number)
+            session.label = day_dir.name
+            try:
+                with running_in(day_dir), contextlib.redirect_stdout(io.StringIO()):
+                    runpy.run_path(str(day_dir / f'{day_dir.name}.py'), run_name='__main__')
+            except Exception as e:
+                errors.append(f'{day_dir.name}: {type(e).__name__}: {e}')
+    return session, errors
@@ -0,0 +1,78 @@
+import dataclasses
+import os
+import pathlib
+from typing import Optional, Any
+
+from common.lazy_import import lazy_import
+
+pickle = lazy_import('pickle')
+tempfile = lazy_import('tempfile')
+
+
+@dataclasses.dataclass
+class CheckpointConfig:
+    """
+    How often a StreamingSolver saves its progress through a file, and whether to pick up from a saved checkpoint.
+
+    Checkpoints are taken once at least every_items items or every_bytes bytes have been processed since the last
+    one (whichever comes first), checked after each read window. They're written to
+    `<directory>/<input file name>.checkpoint`, next to the input by default, and removed once the file is solved.
+    """
+    every_items: Optional[int] = None
+    every_bytes: Optional[int] = None
+    directory: Optional[str | pathlib.Path] = None
+    resume: bool = False
+
+    def path_for(self, file_name: str) -> pathlib.Path:
+        input_path = pathlib.Path(file_name)
+        directory = pathlib.Path(self.directory) if self.directory is not None else input_path.parent
+        return directory / f'{input_path.name}.checkpoint'
+
+    def is_due(self, items_since_checkpoint: int, bytes_since_checkpoint: int) -> bool:
+        return (
+            (self.every_items is not None and items_since_checkpoint >= self.every_items)
+            or (self.every_bytes is not None and bytes_since_checkpoint >= self.every_bytes)
+        )
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    file_size: int
+    file_mtime_ns: int
+    # Byte offset of the first item that hasn't been processed yet
+    offset: int
+    item_count: int
+    solution_names: list[str]
+    # State of each solution, including the ones that were already done, which still have their results in it
+    solution_states: list[Any]
+    solution_done: list[bool]
+    done_after_items: list[Optional[int]]
+
+    def matches(self, file_name: str, solution_names: list[str]) -> bool:
+        file_stat = os.stat(file_name)
+        return (
+            self.file_size == file_stat.st_size
+            and self.file_mtime_ns == file_stat.st_mtime_ns
+            and self.solution_names == solution_names
+        )
+
+
+def save_checkpoint(path: pathlib.Path, checkpoint: Checkpoint) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Replacing the old checkpoint atomically means a crash mid-write never leaves a corrupt one behind
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.remove(tmp_name)
+        raise
+
+
+def load_checkpoint(path: pathlib.Path) -> Optional[Checkpoint]:
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
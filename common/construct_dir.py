@@ -1,4 +1,8 @@
+import contextlib
+import os
 import pathlib
+import sys
+from typing import Iterator
 
 BASE_DIR = pathlib.Path(__file__).parent.parent.resolve()
 
@@ -105,12 +109,32 @@ TEMPLATES = {
 }
 
 
+def day_directory(day_number: int) -> pathlib.Path:
+    return BASE_DIR / f"day_{day_number:02d}"
+
+
+@contextlib.contextmanager
+def running_in(day_dir: pathlib.Path) -> Iterator[None]:
+    """
+    Runs the block from inside a day's directory, the way a day's entry point expects to be run: days open their
+    inputs relative to the working directory and import their own helper modules by name
+    """
+    previous_dir = os.getcwd()
+    os.chdir(day_dir)
+    sys.path.insert(0, str(day_dir))
+    try:
+        yield
+    finally:
+        sys.path.remove(str(day_dir))
+        os.chdir(previous_dir)
+
+
 def construct_dir(
     day_number: int,
     template: str,
     option: str = 'x'
 ) -> None:
-    directory = BASE_DIR / f"day_{day_number:02d}"
+    directory = day_directory(day_number)
     directory.mkdir(exist_ok=True)
 
     try:
@@ -1,36 +1,96 @@
+import copy
+import functools
+import pathlib
 import time
-from typing import Generic, TypeVar, Callable, TextIO, Any
+from typing import Generic, TypeVar, Callable, TextIO, Any, Optional, Literal
+
+from common.benchmark import active_benchmark_session
+from common.construct_dir import day_directory
+from common.input_files import find_input_file, detect_compression, open_input, open_input_buffer, InputBufferType
+from common.lazy_import import lazy_import
+from common.parallel import map_with_forked_state
+from common.parse_cache import ParseCache
+from common.profiling import SolutionProfiler
+from common.run_context import active_run_context
+from common.sandbox import SandboxLimits, run_sandboxed
+from common.solver_stats import DecompressionStats
+
+futures = lazy_import('concurrent.futures')
 
 T = TypeVar('T')
 
+ParallelModeType = Literal['thread', 'process'] | None
+
 
 # TODO: might be nice to support different loaders for different days
 class FileSolver(Generic[T]):
     def __init__(
         self,
         file_names: list[str],
-        loader: Callable[[TextIO], T],
+        loader: Callable[[TextIO], T] | Callable[[InputBufferType], T],
         solutions: list[Callable[[T], str | int]],
-        log_func: Callable[[Any], None] = print
+        log_func: Callable[[Any], None] = print,
+        parse_cache: Optional[ParseCache] = None,
+        parallel: ParallelModeType = None,
+        max_workers: Optional[int] = None,
+        profiler: Optional[SolutionProfiler] = None,
+        base_dir: Optional[str | pathlib.Path] = None,
+        sandbox: Optional[SandboxLimits] = None,
+        buffer_input: bool = False,
     ) -> None:
+        """
+        With parallel set, solutions run concurrently and each one gets its own copy of the loaded data, so
+        solutions that mutate it can't affect each other: 'process' forks a worker per solution (sharing the data
+        copy-on-write, so the results have to be picklable), 'thread' hands each thread a deep copy.
+
+        The loader and each solution are profiled when a profiler is given or the AOC_PROFILE environment variable
+        is set, which only happens for serial runs.
+
+        With sandbox limits given (or the AOC_TIMEOUT / AOC_MEMORY_LIMIT_MB environment variables set), solutions
+        instead run one at a time, each in a forked child process under those limits. A solution that times out,
+        runs out of memory or raises is reported as such and the remaining solutions still run.
+
+        With buffer_input set, the loader is handed the input's bytes (see open_input_buffer) instead of a text
+        stream, for loaders like load_char_grid_from_buffer that build straight from them.
+        """
         self._file_names = file_names
         self._loader = loader
         self._solutions = solutions
         self._log_func = log_func
+        self._parse_cache = parse_cache
+        self._parallel = parallel
+        self._max_workers = max_workers
+        self._profiler = profiler or SolutionProfiler.from_env()
+        self._base_dir = base_dir
+        self._sandbox = sandbox or SandboxLimits.from_env()
+        self._buffer_input = buffer_input
 
     @classmethod
     def construct_for_day(
         cls,
         day_number: int,
-        loader: Callable[[TextIO], T],
+        loader: Callable[[TextIO], T] | Callable[[InputBufferType], T],
         solutions: list[Callable[[T], str | int]],
-        log_func: Callable[[Any], None] = print
+        log_func: Callable[[Any], None] = print,
+        parse_cache: Optional[ParseCache] = None,
+        parallel: ParallelModeType = None,
+        max_workers: Optional[int] = None,
+        profiler: Optional[SolutionProfiler] = None,
+        sandbox: Optional[SandboxLimits] = None,
+        buffer_input: bool = False,
     ) -> 'FileSolver[T]':
         return cls(
             file_names=[f'sample_{day_number:02d}.txt', f'input_{day_number:02d}.txt'],
+            base_dir=day_directory(day_number),
             loader=loader,
             solutions=solutions,
-            log_func=log_func
+            log_func=log_func,
+            parse_cache=parse_cache,
+            parallel=parallel,
+            max_workers=max_workers,
+            profiler=profiler,
+            sandbox=sandbox,
+            buffer_input=buffer_input,
         )
 
     def solve_all(self) -> None:
@@ -38,16 +98,113 @@ class FileSolver(Generic[T]):
             self.solve_file(file_name)
 
     def solve_file(self, file_name: str) -> None:
+        file_name = find_input_file(file_name, self._base_dir)
+        session = active_benchmark_session()
+        if session is not None:
+            file_name = session.resolve_input(file_name)
+            # Always loads from disk, a run context would otherwise hand out the same memoized data every time
+            session.benchmark_file_solver(file_name, lambda: self._load_from_disk(file_name), self._solutions)
+            return
+
         self._log_func('=' * 80)
         self._log_func(f'Solving {file_name}:')
-        with open(file_name, 'r') as f:
-            data = self._loader(f)
+        start_time = time.perf_counter()
+        data, from_cache = self._profiled(self._loader.__name__, file_name, self._load_with_cache)(file_name)
+        load_time = time.perf_counter() - start_time
+        self._log_func(f'\tLoaded input{" from cache" if from_cache else ""} (runtime={load_time:0.2f}s)')
 
-        for solution in self._solutions:
-            start_time = time.perf_counter()
-            result = solution(data)
-            end_time = time.perf_counter()
+        if (self._parallel or self._sandbox) and self._profiler:
+            self._log_func('\tSolutions are only profiled when running serially')
+        if self._sandbox:
+            timed_results = [self._run_sandboxed(solution, data) for solution in self._solutions]
+        elif self._parallel == 'process':
+            timed_results = map_with_forked_state(
+                _run_forked_solution,
+                (self._solutions, data),
+                range(len(self._solutions)),
+                self._max_workers or len(self._solutions),
+            )
+        elif self._parallel == 'thread':
+            with futures.ThreadPoolExecutor(max_workers=self._max_workers or len(self._solutions)) as pool:
+                timed_results = list(pool.map(
+                    lambda solution: _run_timed_solution(solution, copy.deepcopy(data), time.thread_time),
+                    self._solutions,
+                ))
+        else:
+            timed_results = [
+                _run_timed_solution(self._profiled(solution.__name__, file_name, solution), data, time.process_time)
+                for solution in self._solutions
+            ]
 
-            execution_time = end_time - start_time
-            self._log_func(f'\tResult for {solution.__name__} (runtime={execution_time:0.2f}s): {result}')
+        context = active_run_context()
+        for solution, (result, execution_time, cpu_time) in zip(self._solutions, timed_results):
+            self._log_func(
+                f'\tResult for {solution.__name__} (runtime={execution_time:0.2f}s, cpu={cpu_time:0.2f}s): {result}'
+            )
+            if context is not None:
+                context.record_result(file_name, solution.__name__, result, execution_time)
         self._log_func('')
+
+    def _run_sandboxed(self, solution: Callable[[T], str | int], data: T) -> tuple[str | int, float, float]:
+        outcome = run_sandboxed(lambda: solution(data), self._sandbox)
+        return outcome.value if outcome.ok else outcome.describe(), outcome.wall_time, outcome.cpu_time
+
+    def _profiled(self, name: str, file_name: str, func: Callable[..., T]) -> Callable[..., T]:
+        if self._profiler is None:
+            return func
+        return functools.partial(
+            self._profiler.profile,
+            f'{pathlib.Path(file_name).name}.{name}',
+            func,
+            log_func=self._log_func,
+        )
+
+    def _load_with_cache(self, file_name: str) -> tuple[T, bool]:
+        if not self._parse_cache:
+            return self._load(file_name), False
+        return self._parse_cache.get_or_compute(
+            file_name,
+            [self._loader],
+            lambda: self._load(file_name),
+        )
+
+    def _load(self, file_name: str) -> T:
+        context = active_run_context()
+        if context is not None and self._buffer_input:
+            return context.load_buffer(file_name, self._loader)
+        if context is not None:
+            return context.load(file_name, self._loader)
+        return self._load_from_disk(file_name)
+
+    def _load_from_disk(self, file_name: str) -> T:
+        decompression_stats = DecompressionStats() if detect_compression(file_name) else None
+        if self._buffer_input:
+            with open_input_buffer(file_name, decompression_stats) as buffer:
+                data = self._loader(buffer)
+        else:
+            with open_input(file_name, decompression_stats) as f:
+                data = self._loader(f)
+        if decompression_stats is not None:
+            self._log_func(f'\t{decompression_stats.format_line()}')
+        return data
+
+
+def _run_timed_solution(
+    solution: Callable[[T], str | int],
+    data: T,
+    cpu_clock: Callable[[], float],
+) -> tuple[str | int, float, float]:
+    """
+    Returns (result, wall time, cpu time), with cpu_clock picking whether CPU time is counted per process or thread
+    """
+    start_time, start_cpu_time = time.perf_counter(), cpu_clock()
+    result = solution(data)
+    return result, time.perf_counter() - start_time, cpu_clock() - start_cpu_time
+
+
+def _run_forked_solution(
+    state: tuple[list[Callable[[T], str | int]], T],
+    index: int,
+) -> tuple[str | int, float, float]:
+    solutions, data = state
+    return _run_timed_solution(solutions[index], data, time.process_time)
@@ -36,7 +36,7 @@ class GraphSearcher(abc.ABC, Generic[NodeType]):
         self,
         start_node: NodeType,
     ) -> tuple[Iterable[NodeType], float]:
-        paths, score = self._get_best_paths(
+        paths, score, _ = self._get_best_paths(
             start_node,
             return_at_first_found_terminal_path=True,
             path_score_pruning_condition=lambda t_score, known_score: t_score > known_score,
@@ -102,7 +102,7 @@ class GraphSearcher(abc.ABC, Generic[NodeType]):
                 heapq.heappush(search_queue, self._format_q_node(
                     node=neighbor,
                     cost_to_travel_to_node=tentative_score,
-                    prev_node=cast(Optional[_QueueNode[[NodeType]]], current)
+                    prev_node=cast(Optional[_QueueNode[NodeType]], current)
                 ))
 
         return _SearchResult(all_best_paths, best_path_score, known_scores_by_node)
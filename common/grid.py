@@ -2,9 +2,14 @@ import collections
 import copy
 import enum
 import itertools
-from typing import Generic, TypeVar, Sequence, TextIO, cast, Optional, Iterable, Callable, Self, Hashable, Protocol
+from typing import Generic, TypeVar, Sequence, TextIO, cast, Optional, Iterable, Callable, Self, Hashable, Protocol, \
+    Mapping
 
 from common.graph_search import GraphSearcher
+from common.input_files import InputBufferType
+from common.lazy_import import lazy_import
+
+np = lazy_import('numpy')
 
 T = TypeVar('T')
 
@@ -36,11 +41,83 @@ ALL_DIRECTIONS = list(Direction)
 CARDINAL_DIRS = [d for d in Direction if sum(map(abs, d.value)) == 1]
 POSITIVE_DIRS = [d for d in Direction if all(val >= 0 for val in d.value)]
 
+DEFAULT_TILE_SIZE = 64
+
 
 def add_point(left: PositionType, right: PositionType) -> PositionType:
     return cast(PositionType, tuple(l + r for l, r in zip(left, right)))
 
 
+class FlatGridIndex:
+    """
+    Addresses the cells of a height x width grid by a single int, `row * width + col`, so hot loops can skip
+    allocating and hashing position tuples.
+
+    Each cell has a border code saying which edges of the grid it's on, and for each border code there's a
+    precomputed tuple of the offsets to the neighbors that are inside the grid, so a cell's neighbors are
+    `[index + offset for offset in offsets_by_border[borders[index]]]`.
+    """
+    _TOP, _BOTTOM, _LEFT, _RIGHT = 1, 2, 4, 8
+
+    def __init__(self, height: int, width: int) -> None:
+        self.height = height
+        self.width = width
+        self.size = height * width
+        self.offsets = {direction: direction.value[0] * width + direction.value[1] for direction in Direction}
+        self.borders = self._compute_borders()
+        self._offsets_by_border_cache: dict[tuple[Direction, ...], list[tuple[int, ...]]] = {}
+
+    def to_index(self, point: PositionType) -> int:
+        row, col = point
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise InvalidPointException(f'Invalid point {point}. Width: {self.width}, Height: {self.height}')
+        return row * self.width + col
+
+    def to_point(self, index: int) -> PositionType:
+        return cast(PositionType, divmod(index, self.width))
+
+    def offsets_by_border(self, directions: Sequence[Direction] = tuple(CARDINAL_DIRS)) -> list[tuple[int, ...]]:
+        """
+        Returns, for each border code, the offsets to the neighbors in the given directions that are in the grid
+        """
+        key = tuple(directions)
+        if key not in self._offsets_by_border_cache:
+            self._offsets_by_border_cache[key] = [
+                tuple(self.offsets[direction] for direction in directions if self._is_inside(border, direction))
+                for border in range(16)
+            ]
+        return self._offsets_by_border_cache[key]
+
+    def iter_neighbors(
+        self,
+        index: int,
+        directions: Sequence[Direction] = tuple(CARDINAL_DIRS),
+    ) -> Iterable[int]:
+        return (index + offset for offset in self.offsets_by_border(directions)[self.borders[index]])
+
+    def _compute_borders(self) -> bytearray:
+        if self.width == 0:
+            return bytearray()
+        borders = bytearray()
+        for row in range(self.height):
+            row_border = (self._TOP if row == 0 else 0) | (self._BOTTOM if row == self.height - 1 else 0)
+            row_borders = bytearray([row_border]) * self.width
+            row_borders[0] |= self._LEFT
+            row_borders[-1] |= self._RIGHT
+            borders += row_borders
+        return borders
+
+    @classmethod
+    def _is_inside(cls, border: int, direction: Direction) -> bool:
+        row_offset, col_offset = direction.value
+        return not (
+            (row_offset < 0 and border & cls._TOP)
+            or (row_offset > 0 and border & cls._BOTTOM)
+            or (col_offset < 0 and border & cls._LEFT)
+            or (col_offset > 0 and border & cls._RIGHT)
+        )
+
+
 class Grid(Generic[T]):
     def __init__(self, grid: Sequence[Sequence[T]]) -> None:
         self._grid = [
@@ -53,14 +130,38 @@ class Grid(Generic[T]):
             for row in self._grid[1:]:
                 assert len(row) == len(self._grid[0])
             self.width = len(grid[0])
+        # Set by snapshot, rows marked here may be shared with another grid and get copied before being written to
+        self._shared_rows: Optional[bytearray] = None
 
     @classmethod
     def create_empty_grid(cls, height: int, width: int, default_cell_value: T) -> 'Grid[T]':
         return Grid([[default_cell_value for _ in range(width)] for _ in range(height)])
 
     def copy(self) -> Self:
+        """
+        Copies the rows but not the cells in them, which is all that's needed for immutable cell values (str, int,
+        enums, tuples, ...). Use deep_copy for grids of mutable cells.
+        """
+        new_grid = copy.copy(self)
+        new_grid._grid = [row.copy() for row in self._grid]
+        new_grid._shared_rows = None
+        return new_grid
+
+    def deep_copy(self) -> Self:
         return copy.deepcopy(self)
 
+    def snapshot(self) -> Self:
+        """
+        Returns a copy-on-write copy: both grids share their rows until one of them writes to a row, which then
+        copies it first. Branching many scratch grids off a base grid only costs the rows each one changes.
+        """
+        new_grid = copy.copy(self)
+        new_grid._grid = list(self._grid)
+        # Conservatively treats every row as shared again, even ones this grid had already copied for itself
+        self._shared_rows = bytearray(b'\x01') * self.height
+        new_grid._shared_rows = bytearray(self._shared_rows)
+        return new_grid
+
     def is_valid_point(self, point: PositionType) -> bool:
         row, col = point
         return 0 <= row < self.height and 0 <= col < self.width
@@ -76,6 +177,9 @@ class Grid(Generic[T]):
             raise InvalidPointException(f'Invalid point {point}')
 
         row, col = point
+        if self._shared_rows is not None and self._shared_rows[row]:
+            self._grid[row] = self._grid[row].copy()
+            self._shared_rows[row] = 0
         self._grid[row][col] = value
 
     def iter_points(
@@ -149,26 +253,379 @@ class Grid(Generic[T]):
 
 
 class SparseGrid(Grid[T]):
+    """
+    Grid for huge, mostly empty worlds. Cells are stored in tile_size x tile_size tiles that are only allocated
+    once a cell in them is set to something other than the default, and the bounding box of those cells is tracked.
+
+    Iterating visits every point in the grid, like any other Grid. iter_occupied_points_and_values only visits the
+    cells that differ from the default, and format_str only renders the bounding box, so both cost time proportional
+    to the occupied area rather than the grid's dimensions.
+    """
     def __init__(
         self,
         dimensions: tuple[int, int],
         values: dict[PositionType, T],
         default_value: T,
+        tile_size: int = DEFAULT_TILE_SIZE,
     ) -> None:
         super().__init__([])
-        self._sparse_grid = dict(values)
         self.height, self.width = dimensions
         self._default_value = default_value
+        self._tile_size = tile_size
+        # (tile row, tile column) -> the tile's cells, row by row
+        self._tiles: dict[PositionType, list[T]] = {}
+        # (min row, min col, max row, max col) of the cells that differ from the default. Resetting a cell on its edge
+        # to the default only marks it stale, it's recomputed the next time it's needed.
+        self._bounds: Optional[tuple[int, int, int, int]] = None
+        self._bounds_stale = False
+        for point, value in values.items():
+            self[point] = value
+
+    def copy(self) -> Self:
+        new_grid = copy.copy(self)
+        new_grid._tiles = {tile_key: tile.copy() for tile_key, tile in self._tiles.items()}
+        return new_grid
+
+    def snapshot(self) -> Self:
+        return self.copy()
 
     def __getitem__(self, point: PositionType) -> T:
         if not self.is_valid_point(point):
             raise InvalidPointException(f'Invalid point {point}. Width: {self.width}, Height: {self.height}')
-        return self._sparse_grid.get(point, self._default_value)
+        row, col = point
+        tile = self._tiles.get((row // self._tile_size, col // self._tile_size))
+        if tile is None:
+            return self._default_value
+        return tile[(row % self._tile_size) * self._tile_size + col % self._tile_size]
 
     def __setitem__(self, point: PositionType, value: Optional[T]) -> None:
         if not self.is_valid_point(point):
             raise InvalidPointException(f'Invalid point {point}')
-        self._sparse_grid[point] = value
+        row, col = point
+        tile_key = (row // self._tile_size, col // self._tile_size)
+        tile = self._tiles.get(tile_key)
+        if value == self._default_value:
+            if tile is not None:
+                tile[(row % self._tile_size) * self._tile_size + col % self._tile_size] = value
+                min_row, min_col, max_row, max_col = self._bounds
+                if row in (min_row, max_row) or col in (min_col, max_col):
+                    self._bounds_stale = True
+            return
+
+        if tile is None:
+            tile = self._tiles[tile_key] = [self._default_value] * (self._tile_size * self._tile_size)
+        tile[(row % self._tile_size) * self._tile_size + col % self._tile_size] = value
+
+        if self._bounds is None:
+            self._bounds = (row, col, row, col)
+        else:
+            min_row, min_col, max_row, max_col = self._bounds
+            self._bounds = (min(min_row, row), min(min_col, col), max(max_row, row), max(max_col, col))
+
+    @property
+    def bounding_box(self) -> Optional[tuple[PositionType, PositionType]]:
+        """
+        The top left and bottom right corners of the cells that differ from the default, None if there are none
+        """
+        bounds = self._current_bounds()
+        if bounds is None:
+            return None
+        min_row, min_col, max_row, max_col = bounds
+        return (min_row, min_col), (max_row, max_col)
+
+    def _current_bounds(self) -> Optional[tuple[int, int, int, int]]:
+        if self._bounds_stale:
+            self._bounds = None
+            for (row, col), _ in self.iter_occupied_points_and_values():
+                if self._bounds is None:
+                    self._bounds = (row, col, row, col)
+                else:
+                    min_row, min_col, max_row, max_col = self._bounds
+                    self._bounds = (min(min_row, row), min(min_col, col), max(max_row, row), max(max_col, col))
+            self._bounds_stale = False
+        return self._bounds
+
+    def iter_occupied_points_and_values(
+        self,
+        row_order_asc: bool = True,
+        col_order_asc: bool = True,
+    ) -> Iterable[tuple[PositionType, T]]:
+        """
+        Like iter_points_and_values, but skips the cells that hold the default value
+        """
+        tile_size = self._tile_size
+        tile_columns_by_tile_row: dict[int, list[int]] = collections.defaultdict(list)
+        for tile_row, tile_col in self._tiles:
+            tile_columns_by_tile_row[tile_row].append(tile_col)
+
+        for tile_row in sorted(tile_columns_by_tile_row, reverse=not row_order_asc):
+            tile_cols = sorted(tile_columns_by_tile_row[tile_row], reverse=not col_order_asc)
+            rows = range(tile_row * tile_size, min((tile_row + 1) * tile_size, self.height))
+            for row in rows if row_order_asc else reversed(rows):
+                # Going across every tile in the band row by row keeps the points in row-major order
+                for tile_col in tile_cols:
+                    tile = self._tiles[tile_row, tile_col]
+                    tile_offset = (row % tile_size) * tile_size - tile_col * tile_size
+                    cols = range(tile_col * tile_size, min((tile_col + 1) * tile_size, self.width))
+                    for col in cols if col_order_asc else reversed(cols):
+                        value = tile[tile_offset + col]
+                        if value != self._default_value:
+                            yield (row, col), value
+
+    def format_str(self, format_val: Callable[[T], str] = str) -> str:
+        """
+        Renders only the bounding box of the cells that differ from the default
+        """
+        bounds = self._current_bounds()
+        if bounds is None:
+            return ''
+        min_row, min_col, max_row, max_col = bounds
+        return '\n'.join(
+            ''.join(format_val(self[row_idx, col_idx]) for col_idx in range(min_col, max_col + 1))
+            for row_idx in range(min_row, max_row + 1)
+        )
+
+
+class ArrayGrid(Grid[T]):
+    """
+    Grid backed by a 2D NumPy array, e.g. of single characters (dtype 'U1') or small ints.
+
+    Indexing and iteration behave like Grid and hand out plain python values. Whole-grid work should go through
+    `array` and the vectorized neighborhood operations instead, which handle every cell at once.
+    """
+    def __init__(self, array: 'numpy.ndarray') -> None:
+        self.array = array
+        # Grid's own methods only ever reach _grid through indexing, which is overridden here
+        self._grid = array
+        self.height, self.width = array.shape
+
+    @classmethod
+    def create_empty_grid(cls, height: int, width: int, default_cell_value: T) -> 'ArrayGrid[T]':
+        return cls(np.full((height, width), default_cell_value))
+
+    @classmethod
+    def from_grid(cls, grid: Grid[T]) -> 'ArrayGrid[T]':
+        return cls(np.array([[grid[row, col] for col in range(grid.width)] for row in range(grid.height)]))
+
+    def copy(self) -> Self:
+        return type(self)(self.array.copy())
+
+    def snapshot(self) -> Self:
+        # Arrays can't share memory copy-on-write, but copying one is a single memcpy anyway
+        return self.copy()
+
+    def __getitem__(self, point: PositionType) -> T:
+        if not self.is_valid_point(point):
+            raise InvalidPointException(f'Invalid point {point}. Width: {self.width}, Height: {self.height}')
+        return self.array[point].item()
+
+    def __setitem__(self, point: PositionType, value: T) -> None:
+        if not self.is_valid_point(point):
+            raise InvalidPointException(f'Invalid point {point}')
+        self.array[point] = value
+
+    def iter_points_and_values(
+        self,
+        row_order_asc: bool = True,
+        col_order_asc: bool = True,
+    ) -> Iterable[tuple[PositionType, T]]:
+        columns = range(self.width) if col_order_asc else range(self.width - 1, -1, -1)
+        for row in range(self.height) if row_order_asc else reversed(range(self.height)):
+            # Converting a whole row at once is much cheaper than going through the array cell by cell
+            values = self.array[row].tolist()
+            for col in columns:
+                yield (row, col), values[col]
+
+    def shifted(self, values: 'numpy.ndarray', direction: Direction, fill_value: T = 0) -> 'numpy.ndarray':
+        """
+        Returns an array of the same shape as values that holds each cell's neighbor in the given direction, or
+        fill_value where that neighbor is outside the grid
+        """
+        result = np.full_like(values, fill_value)
+        target, source = self._shifted_slices(direction)
+        result[target] = values[source]
+        return result
+
+    def stencil(
+        self,
+        values: 'numpy.ndarray',
+        weights: Mapping[Direction, float] | Sequence[Direction],
+    ) -> 'numpy.ndarray':
+        """
+        Returns, for every cell, the weighted sum of its neighbors' values in the given directions (with a weight of
+        1 for each direction when just the directions are given). Neighbors outside the grid count as 0.
+        """
+        if not isinstance(weights, Mapping):
+            weights = {direction: 1 for direction in weights}
+        dtype = np.result_type(values, *weights.values())
+        if dtype.kind in 'biu':
+            # Summing several neighbors can overflow small ints (e.g. a uint8 mask), so ints are summed as int64
+            dtype = np.result_type(dtype, np.int64)
+        result = np.zeros_like(values, dtype=dtype)
+        for direction, weight in weights.items():
+            target, source = self._shifted_slices(direction)
+            result[target] += values[source] if weight == 1 else weight * values[source]
+        return result
+
+    def count_neighbors(
+        self,
+        mask: 'numpy.ndarray',
+        directions: Sequence[Direction] = tuple(ALL_DIRECTIONS),
+    ) -> 'numpy.ndarray':
+        """
+        Returns how many of each cell's neighbors in the given directions are set in the boolean mask, e.g.
+        `grid.count_neighbors(grid.array == '@')`
+        """
+        return self.stencil(mask.view(np.uint8), directions)
+
+    def _shifted_slices(self, direction: Direction) -> tuple[tuple[slice, slice], tuple[slice, slice]]:
+        # The cells whose neighbor in this direction is inside the grid, and those neighbors
+        row_offset, col_offset = direction.value
+        target = (
+            slice(max(0, -row_offset), self.height - max(0, row_offset)),
+            slice(max(0, -col_offset), self.width - max(0, col_offset)),
+        )
+        source = (
+            slice(max(0, row_offset), self.height + min(0, row_offset)),
+            slice(max(0, col_offset), self.width + min(0, col_offset)),
+        )
+        return target, source
+
+
+class BitGrid(Grid[bool]):
+    """
+    Boolean grid that packs each row into a python int, with column c in bit c. Each cell costs a single bit, and
+    whole-grid work is done a row at a time with shifts and bitwise operations on `rows` instead of cell by cell.
+    """
+    def __init__(self, rows: list[int], width: int) -> None:
+        self.rows = rows
+        # Grid's own methods only ever reach _grid through indexing, which is overridden here
+        self._grid = rows
+        self.height = len(rows)
+        self.width = width
+        self.row_mask = (1 << width) - 1
+
+    @classmethod
+    def create_empty_grid(cls, height: int, width: int, default_cell_value: bool = False) -> 'BitGrid':
+        return cls([(1 << width) - 1 if default_cell_value else 0] * height, width)
+
+    @classmethod
+    def from_grid(cls, grid: Grid[T], predicate: Callable[[T], bool]) -> 'BitGrid':
+        """
+        Sets the cells whose value in grid matches the predicate, e.g. `BitGrid.from_grid(grid, lambda c: c == '@')`
+        """
+        # Each row is built as a string of binary digits, most significant (i.e. last column) first
+        digits = [['0'] * grid.width for _ in range(grid.height)]
+        for (row, col), value in grid.iter_points_and_values():
+            if predicate(value):
+                digits[row][grid.width - 1 - col] = '1'
+        return cls([int(''.join(row_digits), 2) if row_digits else 0 for row_digits in digits], grid.width)
+
+    @classmethod
+    def from_mask(cls, mask: 'numpy.ndarray') -> 'BitGrid':
+        """
+        Packs a 2D boolean array, e.g. `BitGrid.from_mask(array_grid.array == '@')`
+        """
+        height, width = mask.shape
+        packed = np.packbits(mask, axis=1, bitorder='little')
+        return cls([int.from_bytes(packed[row].tobytes(), 'little') for row in range(height)], width)
+
+    def copy(self) -> Self:
+        return type(self)(list(self.rows), self.width)
+
+    def snapshot(self) -> Self:
+        # Rows are immutable ints, so copying the row list already shares everything that can be shared
+        return self.copy()
+
+    def __getitem__(self, point: PositionType) -> bool:
+        if not self.is_valid_point(point):
+            raise InvalidPointException(f'Invalid point {point}. Width: {self.width}, Height: {self.height}')
+        row, col = point
+        return bool(self.rows[row] >> col & 1)
+
+    def __setitem__(self, point: PositionType, value: bool) -> None:
+        if not self.is_valid_point(point):
+            raise InvalidPointException(f'Invalid point {point}')
+        row, col = point
+        if value:
+            self.rows[row] |= 1 << col
+        else:
+            self.rows[row] &= ~(1 << col)
+
+    def __and__(self, other: 'BitGrid') -> 'BitGrid':
+        return BitGrid([left & right for left, right in zip(self.rows, other.rows)], self.width)
+
+    def __or__(self, other: 'BitGrid') -> 'BitGrid':
+        return BitGrid([left | right for left, right in zip(self.rows, other.rows)], self.width)
+
+    def __invert__(self) -> 'BitGrid':
+        return BitGrid([~row & self.row_mask for row in self.rows], self.width)
+
+    def count(self) -> int:
+        """
+        Number of set cells
+        """
+        return sum(row.bit_count() for row in self.rows)
+
+    def shifted_rows(self, direction: Direction) -> list[int]:
+        """
+        Returns rows holding each cell's neighbor in the given direction, unset where that neighbor is outside the
+        grid
+        """
+        row_offset, col_offset = direction.value
+        if col_offset > 0:
+            rows = [row >> col_offset for row in self.rows]
+        elif col_offset < 0:
+            rows = [(row << -col_offset) & self.row_mask for row in self.rows]
+        else:
+            rows = self.rows
+        if row_offset > 0:
+            return rows[row_offset:] + [0] * min(row_offset, self.height)
+        if row_offset < 0:
+            return [0] * min(-row_offset, self.height) + rows[:row_offset]
+        return list(rows)
+
+    def count_neighbors(self, directions: Sequence[Direction] = tuple(ALL_DIRECTIONS)) -> list[list[int]]:
+        """
+        Counts each cell's set neighbors in the given directions, bit-sliced: returns for every row the binary
+        digits of all its counts, least significant first, so bit c of planes[row][i] is bit i of the count at
+        (row, c). Every direction is added to all cells of a row at once with a ripple carry of ANDs and XORs.
+        """
+        planes: list[list[int]] = [[] for _ in range(self.height)]
+        for direction in directions:
+            for row_planes, carry in zip(planes, self.shifted_rows(direction)):
+                for digit in range(len(row_planes)):
+                    if not carry:
+                        break
+                    row_planes[digit], carry = row_planes[digit] ^ carry, row_planes[digit] & carry
+                if carry:
+                    row_planes.append(carry)
+        return planes
+
+    def neighbor_count_below(
+        self,
+        threshold: int,
+        directions: Sequence[Direction] = tuple(ALL_DIRECTIONS),
+    ) -> 'BitGrid':
+        """
+        Returns the cells with fewer than threshold set neighbors in the given directions
+        """
+        rows = []
+        for row_planes in self.count_neighbors(directions):
+            if threshold >> len(row_planes):
+                # No count in this row has enough digits to reach the threshold
+                rows.append(self.row_mask)
+                continue
+            # Compares each count with the threshold digit by digit, from the most significant one down
+            below, equal = 0, self.row_mask
+            for digit in range(len(row_planes) - 1, -1, -1):
+                if threshold >> digit & 1:
+                    below |= equal & ~row_planes[digit]
+                    equal &= row_planes[digit]
+                else:
+                    equal &= ~row_planes[digit]
+            rows.append(below & self.row_mask)
+        return BitGrid(rows, self.width)
 
 
 class MazeCellProtocol(Protocol):
@@ -228,6 +685,24 @@ class MazeGrid(Grid[CellType], GraphSearcher[PositionType]):
         ]
         return cls(grid_data)
 
+    @classmethod
+    def parse_grid_from_buffer(
+        cls,
+        buffer: InputBufferType,
+        cell_parser: Callable[[str], CellType],
+    ) -> Self:
+        """
+        Like parse_grid_from_file, but reads the rows straight from the input's bytes. cell_parser is only called
+        once per distinct character, so it should always return the same cell for a character (like an enum lookup).
+        """
+        cells_by_byte: dict[int, CellType] = {}
+        grid_data = []
+        for row in _iter_buffer_rows(buffer):
+            for byte in set(row).difference(cells_by_byte):
+                cells_by_byte[byte] = cell_parser(chr(byte))
+            grid_data.append(list(map(cells_by_byte.__getitem__, row)))
+        return cls(grid_data)
+
     def get_neighbors(self, node: PositionType) -> Iterable[PositionType]:
         return (
             neighbor
@@ -242,6 +717,89 @@ class MazeGrid(Grid[CellType], GraphSearcher[PositionType]):
         return self[node].is_terminal()
 
 
+class FlatMazeGrid(GraphSearcher[int], Generic[CellType]):
+    """
+    A maze like MazeGrid, but stored as one flat list of cells and searched over flat indices (see FlatGridIndex),
+    which makes BFS/Dijkstra over large mazes considerably cheaper. Positions are only used at the API edges.
+    """
+    def __init__(self, height: int, width: int, cells: Sequence[CellType]) -> None:
+        super().__init__()
+        self.height = height
+        self.width = width
+        self.index = FlatGridIndex(height, width)
+        self._cells = list(cells)
+        assert len(self._cells) == self.index.size
+
+        # Cells are only asked about themselves once per distinct cell
+        self._indices_by_cell: dict[CellType, list[int]] = collections.defaultdict(list)
+        for index, cell in enumerate(self._cells):
+            self._indices_by_cell[cell].append(index)
+        self._is_travelable = bytearray(self.index.size)
+        self._is_terminal = bytearray(self.index.size)
+        for cell, indices in self._indices_by_cell.items():
+            is_travelable, is_terminal = cell.is_travelable_point(), cell.is_terminal()
+            for index in indices:
+                self._is_travelable[index] = is_travelable
+                self._is_terminal[index] = is_terminal
+        self._neighbor_offsets = self.index.offsets_by_border(CARDINAL_DIRS)
+
+    @classmethod
+    def from_maze(cls, maze: MazeGrid[CellType]) -> Self:
+        return cls(maze.height, maze.width, [cell for _, cell in maze.iter_points_and_values()])
+
+    @classmethod
+    def parse_grid_from_buffer(
+        cls,
+        buffer: InputBufferType,
+        cell_parser: Callable[[str], CellType],
+    ) -> Self:
+        """
+        Like MazeGrid.parse_grid_from_buffer, including only calling cell_parser once per distinct character
+        """
+        cells_by_byte: dict[int, CellType] = {}
+        cells: list[CellType] = []
+        height = width = 0
+        for row in _iter_buffer_rows(buffer):
+            for byte in set(row).difference(cells_by_byte):
+                cells_by_byte[byte] = cell_parser(chr(byte))
+            cells.extend(map(cells_by_byte.__getitem__, row))
+            height, width = height + 1, len(row)
+        return cls(height, width, cells)
+
+    def __getitem__(self, point: PositionType) -> CellType:
+        return self._cells[self.index.to_index(point)]
+
+    def cell_at(self, index: int) -> CellType:
+        return self._cells[index]
+
+    def get_indices_by_cell_value(self, cell_type: CellType) -> list[int]:
+        return self._indices_by_cell[cell_type]
+
+    def get_location_by_cell_type(self, cell_type: CellType) -> PositionType:
+        indices = self._indices_by_cell[cell_type]
+        if len(indices) != 1:
+            raise InvalidMazeException(f'Invalid cell type {cell_type}')
+        return self.index.to_point(indices[0])
+
+    def get_best_point_path(self, start: PositionType) -> tuple[list[PositionType], float]:
+        path, cost = self.get_best_path(self.index.to_index(start))
+        return [self.index.to_point(index) for index in path], cost
+
+    def get_neighbors(self, node: int) -> Iterable[int]:
+        is_travelable = self._is_travelable
+        return [
+            neighbor
+            for neighbor in [node + offset for offset in self._neighbor_offsets[self.index.borders[node]]]
+            if is_travelable[neighbor]
+        ]
+
+    def edge_weight(self, orig: int, neighbor: int) -> float:
+        return 1
+
+    def is_terminal_node(self, node: int) -> bool:
+        return bool(self._is_terminal[node])
+
+
 def load_char_grid(file: TextIO) -> Grid[str]:
     return Grid([l.strip() for l in file.readlines() if l])
 
@@ -254,6 +812,57 @@ def load_digit_grid(file: TextIO) -> Grid[int]:
     ])
 
 
+def load_char_grid_from_buffer(buffer: InputBufferType) -> Grid[str]:
+    """
+    Like load_char_grid, but decodes one row of the input's bytes at a time instead of reading all lines up front
+    """
+    return Grid([row.decode('latin-1') for row in _iter_buffer_rows(buffer)])
+
+
+_DIGIT_VALUES = bytes.maketrans(b'0123456789', bytes(range(10)))
+
+
+def load_digit_grid_from_buffer(buffer: InputBufferType) -> Grid[int]:
+    """
+    Like load_digit_grid, but converts each row's digits with a byte translation rather than an int() per cell
+    """
+    # Grid turns each row of digit values into a list of ints
+    return Grid([row.translate(_DIGIT_VALUES) for row in _iter_buffer_rows(buffer)])
+
+
+def load_char_array_grid_from_buffer(buffer: InputBufferType) -> ArrayGrid[str]:
+    """
+    Like load_char_grid_from_buffer, but into an ArrayGrid of single characters
+    """
+    rows = list(_iter_buffer_rows(buffer))
+    width = len(rows[0]) if rows else 0
+    codes = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(len(rows), width)
+    # 'U1' characters are stored as UCS-4 code points, which for latin-1 are just the byte values widened
+    return ArrayGrid(codes.astype(np.uint32).view('U1'))
+
+
+def load_digit_array_grid_from_buffer(buffer: InputBufferType) -> ArrayGrid[int]:
+    rows = list(_iter_buffer_rows(buffer))
+    width = len(rows[0]) if rows else 0
+    digits = np.frombuffer(b''.join(rows).translate(_DIGIT_VALUES), dtype=np.uint8).reshape(len(rows), width)
+    return ArrayGrid(digits.copy())
+
+
+def _iter_buffer_rows(buffer: InputBufferType) -> Iterable[bytes]:
+    """
+    Yields each non-blank line of the buffer with surrounding whitespace stripped, copying only that line
+    """
+    start = 0
+    while start < len(buffer):
+        end = buffer.find(b'\n', start)
+        if end == -1:
+            end = len(buffer)
+        row = buffer[start:end].strip()
+        if row:
+            yield row
+        start = end + 1
+
+
 def scale_relative_point(point: (int, int), scale: int) -> (int, int):
     return tuple(scale * cord for cord in point)
 
@@ -0,0 +1,138 @@
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+import mmap
+import os
+import pathlib
+import time
+from typing import TextIO, Optional, Callable, BinaryIO, Iterator
+
+from common.solver_stats import DecompressionStats
+
+_OPENERS_BY_COMPRESSION: dict[str, Callable[[str], BinaryIO]] = {
+    'gzip': gzip.open,
+    'xz': lzma.open,
+    'bz2': bz2.open,
+}
+
+_COMPRESSION_BY_EXTENSION = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.xz': 'xz',
+    '.lzma': 'xz',
+    '.bz2': 'bz2',
+}
+
+_COMPRESSION_BY_MAGIC = {
+    b'\x1f\x8b': 'gzip',
+    b'\xfd7zXZ\x00': 'xz',
+    b'BZh': 'bz2',
+}
+
+_DECOMPRESSED_BUFFER_SIZE = 1 << 16
+
+# What buffer loaders get handed: a read-only mmap of the file, or the decompressed bytes of a compressed one
+InputBufferType = mmap.mmap | bytes
+
+
+def find_input_file(file_name: str, base_dir: Optional[str | pathlib.Path] = None) -> str:
+    """
+    Returns file_name if it exists, otherwise the first compressed version of it (e.g. input_01.txt.gz) that does.
+
+    Relative file names are taken relative to base_dir when it's given instead of the working directory.
+    """
+    if base_dir is not None and not os.path.isabs(file_name):
+        file_name = os.path.relpath(os.path.join(base_dir, file_name))
+    if os.path.exists(file_name):
+        return file_name
+    for extension in _COMPRESSION_BY_EXTENSION:
+        if os.path.exists(file_name + extension):
+            return file_name + extension
+    return file_name
+
+
+def detect_compression(file_name: str) -> Optional[str]:
+    """
+    Returns the compression format of the file ('gzip', 'xz' or 'bz2') based on its extension, falling back to its
+    first few bytes, or None for an uncompressed file
+    """
+    compression = _COMPRESSION_BY_EXTENSION.get(pathlib.Path(file_name).suffix.lower())
+    if compression:
+        return compression
+
+    with open(file_name, 'rb') as f:
+        header = f.read(max(map(len, _COMPRESSION_BY_MAGIC)))
+    for magic, compression in _COMPRESSION_BY_MAGIC.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def open_input(file_name: str, stats: Optional[DecompressionStats] = None) -> TextIO:
+    """
+    Opens an input file for reading as text, decompressing it on the fly if needed.
+
+    A decompressed stream has no fileno, so the item splitter falls back to reading it in chunks instead of memory
+    mapping it. Time spent reading and decompressing is added to stats.
+    """
+    if detect_compression(file_name) is None:
+        return open(file_name, 'r')
+    return io.TextIOWrapper(open_binary_input(file_name, stats))
+
+
+def open_binary_input(file_name: str, stats: Optional[DecompressionStats] = None) -> BinaryIO:
+    """
+    Like open_input, but for reading bytes
+    """
+    compression = detect_compression(file_name)
+    if compression is None:
+        return open(file_name, 'rb')
+
+    raw = _TimedDecompressingReader(
+        _OPENERS_BY_COMPRESSION[compression](file_name),
+        os.path.getsize(file_name),
+        stats if stats is not None else DecompressionStats(),
+    )
+    return io.BufferedReader(raw, _DECOMPRESSED_BUFFER_SIZE)
+
+
+@contextlib.contextmanager
+def open_input_buffer(file_name: str, stats: Optional[DecompressionStats] = None) -> Iterator[InputBufferType]:
+    """
+    Memory maps an input file for reading its bytes without copying them, or reads the whole file into memory if
+    it's compressed (or empty, which can't be mapped).
+
+    The mmap is closed on exit, so whatever is kept from it has to be copied out (slicing an mmap copies) rather
+    than referenced through a memoryview.
+    """
+    if detect_compression(file_name) is not None or os.path.getsize(file_name) == 0:
+        with open_binary_input(file_name, stats) as f:
+            yield f.read()
+        return
+
+    with open(file_name, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield buffer
+
+
+class _TimedDecompressingReader(io.RawIOBase):
+    def __init__(self, decompressed: BinaryIO, compressed_size: int, stats: DecompressionStats) -> None:
+        super().__init__()
+        self._decompressed = decompressed
+        self._stats = stats
+        self._stats.compressed_bytes += compressed_size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        start_time = time.perf_counter()
+        size = self._decompressed.readinto(buffer)
+        self._stats.decompress_time += time.perf_counter() - start_time
+        self._stats.decompressed_bytes += size
+        return size
+
+    def close(self) -> None:
+        self._decompressed.close()
+        super().close()
@@ -0,0 +1,397 @@
+import codecs
+import io
+import mmap
+import os
+import re
+import stat
+import time
+from typing import TextIO, Iterable, Optional, BinaryIO
+
+DelimiterType = str | re.Pattern | None
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def split_text_stream(
+    file: TextIO,
+    delimiter: DelimiterType,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterable[str]:
+    """
+    Splits a text stream into items in linear time.
+
+    A delimiter of None splits on lines (keeping the line endings, like iterating the file does). Plain string
+    delimiters may be any length, and compiled patterns are matched with `re.finditer`. A trailing item
+    without a delimiter is only produced when it's non-empty.
+    """
+    if delimiter is None:
+        yield from file
+        return
+
+    leftover = ""
+    while chunk := file.read(chunk_size):
+        items, leftover = _split_complete_items(leftover + chunk, delimiter, at_eof=False)
+        yield from items
+
+    items, leftover = _split_complete_items(leftover, delimiter, at_eof=True)
+    yield from items
+    if leftover:
+        yield leftover
+
+
+def _split_complete_items(text: str, delimiter: str | re.Pattern, at_eof: bool) -> tuple[list[str], str]:
+    if isinstance(delimiter, str):
+        *items, leftover = text.split(delimiter)
+        return items, leftover
+
+    items = []
+    item_start = 0
+    for match in delimiter.finditer(text):
+        # A match touching the end of the text might still extend into the next chunk
+        if match.end() == len(text) and not at_eof:
+            break
+        if match.end() == match.start():
+            continue
+        items.append(text[item_start:match.start()])
+        item_start = match.end()
+    return items, text[item_start:]
+
+
+def follow_text_stream(
+    file: TextIO,
+    delimiter: DelimiterType,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    poll_interval: float = 0.5,
+    idle_timeout: Optional[float] = None,
+) -> Iterable[list[str]]:
+    """
+    Splits a text stream that's still being appended to, yielding the complete items from each read as they arrive.
+
+    When a read finds no new data, an empty list is yielded before sleeping for poll_interval, so callers get a
+    chance to do periodic work while the stream is idle. Following stops once nothing new has arrived for
+    idle_timeout seconds (or never, if it's None). An item is held back until its delimiter arrives, except for a
+    non-empty trailing item when following stops.
+    """
+    leftover = ""
+    last_data_time = time.monotonic()
+    while True:
+        chunk = file.read(chunk_size)
+        if chunk:
+            last_data_time = time.monotonic()
+            items, leftover = _split_followed_items(leftover + chunk, delimiter)
+            yield items
+            continue
+
+        if idle_timeout is not None and time.monotonic() - last_data_time >= idle_timeout:
+            break
+        yield []
+        time.sleep(poll_interval)
+
+    if delimiter is not None:
+        items, leftover = _split_complete_items(leftover, delimiter, at_eof=True)
+        yield items
+    if leftover:
+        yield [leftover]
+
+
+def _split_followed_items(text: str, delimiter: DelimiterType) -> tuple[list[str], str]:
+    if delimiter is not None:
+        return _split_complete_items(text, delimiter, at_eof=False)
+
+    # Only split on newlines, like iterating a text file does (str.splitlines also splits on other separators)
+    lines = io.StringIO(text, newline='\n').readlines()
+    if lines and not lines[-1].endswith('\n'):
+        leftover = lines.pop()
+        return lines, leftover
+    return lines, ''
+
+
+def split_buffer(
+    buffer: bytes | mmap.mmap,
+    delimiter: DelimiterType,
+    encoding: str = 'utf-8',
+    start: int = 0,
+    end: Optional[int] = None,
+    window_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterable[tuple[int, list[str]]]:
+    """
+    Splits buffer[start:end] into items, one window of roughly window_size bytes at a time.
+
+    Each window is decoded once and yielded as (offset of the first item after the window, items in the window),
+    so callers always know a byte offset that's safe to resume from. Items follow the same rules as
+    `split_text_stream`.
+    """
+    end = len(buffer) if end is None else end
+    pos = start
+    while pos < end:
+        if isinstance(delimiter, re.Pattern):
+            window_end = _find_window_end(buffer, delimiter, pos, min(pos + window_size, end), end, encoding)
+            # Windows always end on an item boundary, so a match at the end of one is complete
+            items, leftover = _split_complete_items(str(buffer[pos:window_end], encoding), delimiter, at_eof=True)
+            if leftover:
+                items.append(leftover)
+        else:
+            window_end, items = _split_window(buffer, delimiter, pos, end, window_size, encoding)
+        yield window_end, items
+        pos = window_end
+
+
+def _split_window(
+    buffer: bytes | mmap.mmap,
+    delimiter: Optional[str],
+    start: int,
+    end: int,
+    window_size: int,
+    encoding: str,
+) -> tuple[int, list[str]]:
+    # Splits the text going forward from start exactly like split_text_stream does, then works out where in the
+    # buffer the last complete item ends from the length of what's left over. The window grows until it holds at
+    # least one complete item, so huge items don't stall the split.
+    window_end = min(start + window_size, end)
+    while True:
+        at_end = window_end == end
+        decoder = codecs.getincrementaldecoder(encoding)()
+        # A window can end partway through a multibyte character, which the decoder then holds back
+        text = decoder.decode(buffer[start:window_end], final=at_end)
+        if delimiter is None:
+            items, leftover = _split_followed_items(text, None)
+        else:
+            items, leftover = _split_complete_items(text, delimiter, at_eof=False)
+        if at_end:
+            if leftover:
+                items.append(leftover)
+            return end, items
+        if items:
+            undecoded, _ = decoder.getstate()
+            return window_end - len(undecoded) - len(leftover.encode(encoding)), items
+        window_end = min(end, start + 2 * (window_end - start))
+
+
+def _find_window_end(
+    buffer: bytes | mmap.mmap,
+    delimiter: DelimiterType,
+    start: int,
+    target_end: int,
+    end: int,
+    encoding: str,
+) -> int:
+    # Grows the window until it holds at least one complete item, so huge items don't stall the split
+    while target_end < end:
+        boundary = _last_item_boundary(buffer, delimiter, start, target_end, encoding)
+        if boundary > start:
+            return boundary
+        target_end = min(end, start + 2 * (target_end - start))
+    return end
+
+
+def _last_item_boundary(
+    buffer: bytes | mmap.mmap,
+    delimiter: DelimiterType,
+    start: int,
+    end: int,
+    encoding: str,
+) -> int:
+    """
+    Splits buffer[start:end] the way split_text_stream would, where start has to be the start of an item, and returns
+    where the last item that's complete within it ends, or -1 if there is none
+    """
+    if isinstance(delimiter, re.Pattern):
+        boundary = -1
+        for match in _encode_pattern(delimiter, encoding).finditer(buffer, start, end):
+            if match.start() < match.end() < end:
+                boundary = match.end()
+        return boundary
+
+    # bytes.split matches like str.split does: leftmost first and without overlaps, going forward from start. Matching
+    # anywhere else can cut a run of a delimiter that overlaps itself (e.g. ';;' in ';;;') at a different point.
+    *items, leftover = buffer[start:end].split(_delimiter_bytes(delimiter, encoding))
+    return end - len(leftover) if items else -1
+
+
+def find_item_boundary(
+    buffer: bytes | mmap.mmap,
+    delimiter: DelimiterType,
+    offset: int,
+    encoding: str = 'utf-8',
+    item_start: int = 0,
+    window_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Returns the offset of the first item that starts at or after the given offset, going forward from item_start,
+    which has to be the start of an item at or before offset
+    """
+    if offset <= item_start:
+        return item_start
+    if offset >= len(buffer):
+        return len(buffer)
+
+    if not isinstance(delimiter, re.Pattern):
+        delimiter_bytes = _delimiter_bytes(delimiter, encoding)
+        if not _can_overlap_itself(delimiter_bytes):
+            # The forward scan then matches every occurrence, so it can just as well resume from any of them
+            found = buffer.find(delimiter_bytes, offset - len(delimiter_bytes))
+            return len(buffer) if found == -1 else found + len(delimiter_bytes)
+
+    # Moves up to the last boundary before offset a window at a time, at the speed of a split
+    pos = item_start
+    window = window_size
+    while pos < offset:
+        window_end = min(pos + window, offset)
+        boundary = _last_item_boundary(buffer, delimiter, pos, window_end, encoding)
+        if boundary == offset:
+            return offset
+        if boundary > pos:
+            pos = boundary
+            window = window_size
+        elif window_end == offset:
+            break
+        else:
+            window *= 2
+
+    # Nothing between pos and offset completes an item, so the first match from pos ends the item straddling offset
+    if isinstance(delimiter, re.Pattern):
+        for match in _encode_pattern(delimiter, encoding).finditer(buffer, pos):
+            if match.end() > match.start():
+                return match.end()
+        return len(buffer)
+    found = buffer.find(delimiter_bytes, pos)
+    return len(buffer) if found == -1 else found + len(delimiter_bytes)
+
+
+def _delimiter_bytes(delimiter: Optional[str], encoding: str) -> bytes:
+    return b'\n' if delimiter is None else delimiter.encode(encoding)
+
+
+def _can_overlap_itself(delimiter_bytes: bytes) -> bool:
+    # Two occurrences can only overlap if some proper prefix of the delimiter is also a suffix of it
+    return any(
+        delimiter_bytes[:length] == delimiter_bytes[-length:]
+        for length in range(1, len(delimiter_bytes))
+    )
+
+
+def _encode_pattern(pattern: re.Pattern, encoding: str) -> re.Pattern:
+    if isinstance(pattern.pattern, bytes):
+        return pattern
+    return re.compile(pattern.pattern.encode(encoding), pattern.flags & ~re.UNICODE)
+
+
+def open_mmap(file: TextIO) -> Optional[mmap.mmap]:
+    """
+    Memory maps the file backing the given stream, or returns None if it isn't a non-empty regular file
+    """
+    try:
+        fileno = file.fileno()
+        file_stat = os.fstat(fileno)
+    except (AttributeError, OSError, ValueError):
+        return None
+
+    if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size == 0:
+        return None
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
+def has_carriage_returns(buffer: bytes | mmap.mmap, start: int = 0) -> bool:
+    """
+    Whether buffer[start:] has any CR line endings, which a text stream would have translated to '\n'. Splitting
+    straight out of the buffer doesn't translate them, so such buffers have to go through a text stream instead.
+    """
+    return buffer.find(b'\r', start) != -1
+
+
+def file_has_carriage_returns(file_name: str) -> bool:
+    with open(file_name, 'rb') as f:
+        mapped = open_mmap(f)
+        if mapped is None:
+            return False
+        with mapped:
+            return has_carriage_returns(mapped)
+
+
+def split_file(
+    file: TextIO,
+    delimiter: DelimiterType,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_mmap: bool = True,
+) -> Iterable[str]:
+    """
+    Splits the remainder of an open text file into items.
+
+    Regular files are split straight out of an mmap when the stream position can be mapped to a byte offset and the
+    rest of the file has no CR line endings, anything else goes through the chunked reader.
+    """
+    mapped = open_mmap(file) if use_mmap and delimiter is not None else None
+    if mapped is None:
+        yield from split_text_stream(file, delimiter, chunk_size)
+        return
+
+    try:
+        start = file.tell()
+    except OSError:
+        # Text streams can't report their position while being iterated line by line
+        start = None
+    if start is None or has_carriage_returns(mapped, start):
+        mapped.close()
+        yield from split_text_stream(file, delimiter, chunk_size)
+        return
+
+    with mapped:
+        for _, items in split_buffer(mapped, delimiter, file.encoding, start, window_size=chunk_size):
+            yield from items
+    file.seek(0, os.SEEK_END)
+
+
+def plan_shards(
+    buffer: bytes | mmap.mmap,
+    delimiter: DelimiterType,
+    start: int,
+    num_shards: int,
+    encoding: str = 'utf-8',
+) -> list[tuple[int, int]]:
+    """
+    Splits buffer[start:] into up to num_shards (start, end) byte ranges, each beginning on an item boundary
+    """
+    size = len(buffer) - start
+    boundaries = [start]
+    for i in range(1, num_shards):
+        # Each boundary is a known item start to scan forward from for the next one
+        boundaries.append(
+            find_item_boundary(buffer, delimiter, start + size * i // num_shards, encoding, boundaries[-1])
+        )
+    boundaries.append(len(buffer))
+    return [
+        (shard_start, shard_end)
+        for shard_start, shard_end in zip(boundaries, boundaries[1:])
+        if shard_end > shard_start
+    ]
+
+
+class ByteOffsetTextReader(io.TextIOBase):
+    """
+    Minimal line oriented text reader over a binary file that always knows its byte offset.
+
+    Unlike TextIOWrapper it doesn't read ahead, so `tell` stays accurate even after the reader is iterated.
+    """
+    def __init__(self, raw: BinaryIO, encoding: str) -> None:
+        super().__init__()
+        self._raw = raw
+        self._encoding = encoding
+
+    @property
+    def encoding(self) -> str:
+        return self._encoding
+
+    def readable(self) -> bool:
+        return True
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        return self._raw.readline(-1 if size is None else size).decode(self._encoding)
+
+    def read(self, size: Optional[int] = -1) -> str:
+        return self._raw.read(-1 if size is None else size).decode(self._encoding)
+
+    def tell(self) -> int:
+        return self._raw.tell()
+
+    def fileno(self) -> int:
+        return self._raw.fileno()
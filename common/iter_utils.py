@@ -1,3 +1,4 @@
+import itertools
 from collections import deque
 from typing import TypeVar, Iterable
 
@@ -11,3 +12,9 @@ def group_wise(iterable: Iterable[T], group_length: int) -> Iterable[tuple[T]]:
         if len(group) != group_length:
             continue
         yield tuple(group)
+
+
+def chunked(iterable: Iterable[T], chunk_size: int) -> Iterable[list[T]]:
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
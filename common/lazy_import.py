@@ -0,0 +1,107 @@
+import builtins
+import dataclasses
+import sys
+import time
+import types
+from typing import Any, Optional
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module that's only imported the first time one of its attributes is used.
+
+    Annotations that mention the module's types have to be strings, since evaluating them would import it.
+    """
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            # Going through __import__ (rather than importlib) keeps lazy imports visible to ImportTimer
+            builtins.__import__(self.__name__)
+            module = self.__dict__['_module'] = sys.modules[self.__name__]
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded yet'
+        return f'<lazy module {self.__name__!r} ({state})>'
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Returns the module if it's already imported, otherwise a LazyModule that imports it on first use. Submodules
+    can be imported directly, e.g. `spatial = lazy_import('scipy.spatial')`.
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+@dataclasses.dataclass
+class ImportRecord:
+    name: str
+    # Including the modules it imported in turn...
+    cumulative_time: float
+    # ...and excluding them
+    self_time: float
+    # 0 for modules imported directly by the timed code
+    depth: int
+
+
+class ImportTimer:
+    """
+    Records how long each first-time import takes while active, like `python -X importtime` does.
+
+    Only imports made through the import statement (or __import__) on the thread that's running are timed.
+    """
+    def __init__(self) -> None:
+        self.records: list[ImportRecord] = []
+        self._original_import: Optional[Any] = None
+        # Time spent in the nested imports of each import that's in progress
+        self._child_times: list[float] = []
+
+    def __enter__(self) -> 'ImportTimer':
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        builtins.__import__ = self._original_import
+
+    def _timed_import(
+        self,
+        name: str,
+        globals: Optional[dict[str, Any]] = None,
+        locals: Optional[dict[str, Any]] = None,
+        fromlist: tuple[str, ...] = (),
+        level: int = 0,
+    ) -> types.ModuleType:
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._child_times.append(0.0)
+        start_time = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            child_time = self._child_times.pop()
+            self.records.append(ImportRecord(name, elapsed, elapsed - child_time, len(self._child_times)))
+            if self._child_times:
+                self._child_times[-1] += elapsed
+
+    def total_time(self) -> float:
+        return sum(record.cumulative_time for record in self.records if record.depth == 0)
+
+    def slowest(self, count: int) -> list[ImportRecord]:
+        return sorted(
+            (record for record in self.records if record.depth == 0),
+            key=lambda record: record.cumulative_time,
+            reverse=True,
+        )[:count]
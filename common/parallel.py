@@ -0,0 +1,44 @@
+import functools
+from typing import TypeVar, Callable, Iterable, Any
+
+from common.lazy_import import lazy_import
+
+futures = lazy_import('concurrent.futures')
+multiprocessing = lazy_import('multiprocessing')
+
+StateType = TypeVar('StateType')
+ArgType = TypeVar('ArgType')
+ResultType = TypeVar('ResultType')
+
+# Set in each worker process by the pool initializer. Forked workers inherit it from the parent's memory, so
+# the state (solvers, lambdas, locally defined solution classes, loaded data, ...) never needs to be pickled.
+_forked_state: Any = None
+
+
+def _init_forked_worker(state: Any) -> None:
+    global _forked_state
+    _forked_state = state
+
+
+def _call_with_forked_state(func: Callable[[Any, ArgType], ResultType], arg: ArgType) -> ResultType:
+    return func(_forked_state, arg)
+
+
+def map_with_forked_state(
+    func: Callable[[StateType, ArgType], ResultType],
+    state: StateType,
+    args: Iterable[ArgType],
+    max_workers: int,
+) -> list[ResultType]:
+    """
+    Calls func(state, arg) for each arg in a pool of forked processes, returning results in order.
+
+    func must be a module level function and each arg/result must be picklable, but state can be anything.
+    """
+    with futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('fork'),
+        initializer=_init_forked_worker,
+        initargs=(state,),
+    ) as pool:
+        return list(pool.map(functools.partial(_call_with_forked_state, func), args))
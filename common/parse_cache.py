@@ -0,0 +1,125 @@
+import inspect
+import os
+import pathlib
+from typing import TypeVar, Callable, Sequence, Optional, Any
+
+from common.construct_dir import BASE_DIR
+from common.lazy_import import lazy_import
+
+hashlib = lazy_import('hashlib')
+pickle = lazy_import('pickle')
+tempfile = lazy_import('tempfile')
+
+T = TypeVar('T')
+
+DEFAULT_CACHE_DIR = BASE_DIR / '.parse_cache'
+DEFAULT_MAX_CACHE_BYTES = 1 << 30
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed input files.
+
+    Entries are keyed by the input file's contents plus the name and source of each parser involved, so editing
+    either the input or a parser invalidates them. NumPy arrays are stored as .npz, anything else is pickled. Once
+    the cache grows past max_bytes, the least recently used entries are evicted.
+    """
+    def __init__(
+        self,
+        cache_dir: str | pathlib.Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+    ) -> None:
+        self._cache_dir = pathlib.Path(cache_dir)
+        self._max_bytes = max_bytes
+
+    def get_or_compute(
+        self,
+        file_name: str,
+        parsers: Sequence[Optional[Callable[..., Any]]],
+        compute: Callable[[], T],
+        extra_key: str = '',
+    ) -> tuple[T, bool]:
+        """
+        Returns (value, whether it came from the cache), calling compute and storing its result on a miss
+        """
+        key = self._compute_key(file_name, parsers, extra_key)
+        for path in (self._cache_dir / f'{key}.pkl', self._cache_dir / f'{key}.npz'):
+            if path.exists():
+                value = self._load(path)
+                # Touching the entry is what makes eviction least-recently-used rather than oldest-first
+                os.utime(path)
+                return value, True
+
+        value = compute()
+        self._store(key, value)
+        return value, False
+
+    def _compute_key(self, file_name: str, parsers: Sequence[Optional[Callable[..., Any]]], extra_key: str) -> str:
+        key_hash = hashlib.sha256()
+        with open(file_name, 'rb') as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                key_hash.update(chunk)
+
+        for parser in parsers:
+            key_hash.update(_describe_parser(parser).encode())
+        key_hash.update(extra_key.encode())
+        return key_hash.hexdigest()
+
+    def _load(self, path: pathlib.Path) -> Any:
+        if path.suffix == '.npz':
+            import numpy
+            with numpy.load(path) as arrays:
+                return arrays['value']
+
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _store(self, key: str, value: Any) -> None:
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        is_array = type(value).__module__ == 'numpy' and type(value).__name__ == 'ndarray'
+        path = self._cache_dir / f'{key}.{"npz" if is_array else "pkl"}'
+
+        fd, tmp_name = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if is_array:
+                    import numpy
+                    numpy.savez(f, value=value)
+                else:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Not everything a parser returns can be pickled (generators, locally defined classes, ...), and
+            # those results just don't get cached
+            os.remove(tmp_name)
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = [
+            (entry.stat().st_mtime, entry.stat().st_size, entry)
+            for entry in self._cache_dir.iterdir()
+            if entry.suffix in ('.pkl', '.npz')
+        ]
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total_bytes <= self._max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total_bytes -= size
+
+
+def _describe_parser(parser: Optional[Callable[..., Any]]) -> str:
+    if parser is None:
+        return 'None'
+
+    name = f'{getattr(parser, "__module__", "")}.{getattr(parser, "__qualname__", repr(parser))}'
+    try:
+        source = inspect.getsource(parser)
+    except (OSError, TypeError):
+        code = getattr(parser, '__code__', None)
+        source = code.co_code.hex() if code else ''
+    return f'{name}:{hashlib.sha256(source.encode()).hexdigest()}'
@@ -0,0 +1,145 @@
+import threading
+import time
+from typing import Generic, TypeVar, Iterable, Iterator, Optional, Literal
+
+from common.lazy_import import lazy_import
+from common.solver_stats import PipelineStats
+
+multiprocessing = lazy_import('multiprocessing')
+pickle = lazy_import('pickle')
+queue = lazy_import('queue')
+
+T = TypeVar('T')
+
+ProducerModeType = Literal['thread', 'process']
+
+_POLL_INTERVAL = 0.1
+
+
+class _EndOfStream:
+    def __init__(
+        self,
+        error: Optional[BaseException] = None,
+        producer_wait_time: float = 0.0,
+        max_queue_depth: int = 0,
+    ) -> None:
+        self.error = error
+        # A producer process can't update the consumer's stats, so it reports its side of them once it's done
+        self.producer_wait_time = producer_wait_time
+        self.max_queue_depth = max_queue_depth
+
+
+class BoundedProducer(Generic[T]):
+    """
+    Drains an iterable in the background, handing its items to the consumer through a bounded queue.
+
+    With mode='thread' the source is drained on a background thread, which only overlaps with the consumer while
+    one of them releases the GIL (reading, decompressing, ...), so it only pays off for I/O bound sources. With
+    mode='process' it's drained in a forked child process instead, which also overlaps CPU bound work (like
+    parsing) but pickles every item over to the consumer, so items have to be picklable and worth more than
+    pickling them.
+
+    Items come out in the same order they're produced, and exceptions raised by the source are re-raised in the
+    consumer. Closing the producer (or abandoning iteration) stops the background thread or process.
+    """
+    def __init__(
+        self,
+        source: Iterable[T],
+        max_queue_size: int,
+        stats: Optional[PipelineStats] = None,
+        mode: ProducerModeType = 'thread',
+    ) -> None:
+        self._source = source
+        self._stats = stats or PipelineStats()
+        self._mode = mode
+        if mode == 'process':
+            context = multiprocessing.get_context('fork')
+            self._queue = context.Queue(maxsize=max(1, max_queue_size))
+            self._stopped = context.Event()
+            self._worker = context.Process(target=self._produce, daemon=True)
+        else:
+            self._queue = queue.Queue(maxsize=max(1, max_queue_size))
+            self._stopped = threading.Event()
+            self._worker = threading.Thread(target=self._produce, daemon=True)
+
+    def __iter__(self) -> Iterator[T]:
+        self._worker.start()
+        try:
+            while True:
+                start_time = time.perf_counter()
+                item = self._get()
+                self._stats.consumer_wait_time += time.perf_counter() - start_time
+
+                if isinstance(item, _EndOfStream):
+                    if self._mode == 'process':
+                        self._stats.producer_wait_time += item.producer_wait_time
+                        self._stats.max_queue_depth = max(self._stats.max_queue_depth, item.max_queue_depth)
+                    if item.error is not None:
+                        raise item.error
+                    return
+                if self._mode == 'process':
+                    self._stats.chunk_count += 1
+                    item = pickle.loads(item)
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._worker.is_alive():
+            self._worker.join()
+
+    def _get(self) -> T | bytes | _EndOfStream:
+        if self._mode != 'process':
+            return self._queue.get()
+        while True:
+            try:
+                return self._queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if not self._worker.is_alive() and self._queue.empty():
+                    error = RuntimeError(f'Producer process died with exit code {self._worker.exitcode}')
+                    return _EndOfStream(error)
+
+    def _produce(self) -> None:
+        try:
+            for item in self._source:
+                if self._mode == 'process':
+                    # Pickled here rather than by the queue's feeder thread, which would drop unpicklable items
+                    # with just a printed traceback
+                    item = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+                if not self._put(item):
+                    break
+                self._stats.chunk_count += 1
+            else:
+                self._put(self._end_of_stream())
+        except BaseException as e:
+            if self._mode == 'process' and not _is_picklable(e):
+                e = RuntimeError(f'{type(e).__name__}: {e}')
+            self._put(self._end_of_stream(e))
+
+        if self._mode == 'process' and self._stopped.is_set():
+            # Otherwise exiting waits for whatever's still buffered to be flushed into a queue nobody reads anymore
+            self._queue.cancel_join_thread()
+
+    def _end_of_stream(self, error: Optional[BaseException] = None) -> _EndOfStream:
+        return _EndOfStream(error, self._stats.producer_wait_time, self._stats.max_queue_depth)
+
+    def _put(self, item: T | bytes | _EndOfStream) -> bool:
+        start_time = time.perf_counter()
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_INTERVAL)
+            except queue.Full:
+                continue
+            self._stats.producer_wait_time += time.perf_counter() - start_time
+            self._stats.max_queue_depth = max(self._stats.max_queue_depth, self._queue.qsize())
+            return True
+        return False
+
+
+def _is_picklable(value: object) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
@@ -0,0 +1,131 @@
+import collections
+import cProfile
+import os
+import pathlib
+import re
+import sys
+import threading
+import types
+from typing import TypeVar, Callable, Any, Optional, Iterable
+
+from common.construct_dir import BASE_DIR
+from common.lazy_import import lazy_import
+
+pstats = lazy_import('pstats')
+
+T = TypeVar('T')
+
+# Set to 1 to profile into DEFAULT_PROFILE_DIR, or to the directory to write profiles to
+PROFILE_ENV_VAR = 'AOC_PROFILE'
+PROFILE_TOP_N_ENV_VAR = 'AOC_PROFILE_TOP'
+
+DEFAULT_PROFILE_DIR = BASE_DIR / '.profiles'
+DEFAULT_TOP_N = 10
+DEFAULT_SAMPLE_INTERVAL = 0.001
+
+
+class SolutionProfiler:
+    """
+    Runs functions under cProfile and a sampling profiler at the same time.
+
+    Each profiled run writes `<label>.prof` (open it with pstats or snakeviz) and `<label>.collapsed`, one
+    `frame;frame;frame count` line per sampled stack (feed it to flamegraph.pl or speedscope), and logs its top_n
+    functions by self time.
+    """
+    def __init__(
+        self,
+        output_dir: str | pathlib.Path = DEFAULT_PROFILE_DIR,
+        top_n: int = DEFAULT_TOP_N,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        self._output_dir = pathlib.Path(output_dir)
+        self._top_n = top_n
+        self._sample_interval = sample_interval
+
+    @classmethod
+    def from_env(cls) -> Optional['SolutionProfiler']:
+        setting = os.environ.get(PROFILE_ENV_VAR)
+        if not setting or setting == '0':
+            return None
+        return cls(
+            output_dir=DEFAULT_PROFILE_DIR if setting == '1' else setting,
+            top_n=int(os.environ.get(PROFILE_TOP_N_ENV_VAR, DEFAULT_TOP_N)),
+        )
+
+    def profile(self, label: str, func: Callable[..., T], *args: Any, log_func: Callable[[Any], None] = print) -> T:
+        sampler = _StackSampler(threading.get_ident(), _stack_depth(sys._getframe()), self._sample_interval)
+        profile = cProfile.Profile()
+        sampler.start()
+        try:
+            result = profile.runcall(func, *args)
+        finally:
+            sampler.stop()
+
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        base_path = self._output_dir / re.sub(r'[^\w.-]+', '_', label)
+        profile.dump_stats(f'{base_path}.prof')
+        with open(f'{base_path}.collapsed', 'w') as f:
+            for stack, count in sorted(sampler.stack_counts.items()):
+                f.write(f'{stack} {count}\n')
+
+        log_func(f'\tProfile for {label} written to {base_path}.prof and {base_path}.collapsed, hottest functions:')
+        for line in self._format_top_functions(pstats.Stats(profile)):
+            log_func(f'\t\t{line}')
+        return result
+
+    def _format_top_functions(self, stats: 'pstats.Stats') -> Iterable[str]:
+        entries = sorted(stats.stats.items(), key=lambda entry: entry[1][2], reverse=True)
+        for (file_name, line_number, func_name), (_, call_count, self_time, cumulative_time, _) in \
+                entries[:self._top_n]:
+            location = f'{os.path.basename(file_name)}:{line_number}' if line_number else file_name
+            yield (
+                f'{self_time:8.3f}s self {cumulative_time:8.3f}s cumulative {call_count:>10d} calls  '
+                f'{func_name} ({location})'
+            )
+
+
+class _StackSampler:
+    def __init__(self, thread_id: int, base_depth: int, interval: float) -> None:
+        self.stack_counts: collections.Counter[str] = collections.Counter()
+        self._thread_id = thread_id
+        # The profiled thread's frames up to SolutionProfiler.profile, plus cProfile's runcall, are left out of the
+        # stacks
+        self._base_depth = base_depth + 1
+        self._interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = _describe_stack(frame)
+            # Samples taken right before or after the profiled call are still inside the profiler itself
+            if len(stack) > self._base_depth and stack[self._base_depth - 1].startswith('runcall '):
+                self.stack_counts[';'.join(stack[self._base_depth:])] += 1
+
+
+def _stack_depth(frame: Optional[types.FrameType]) -> int:
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def _describe_stack(frame: Optional[types.FrameType]) -> list[str]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    stack.reverse()
+    return stack
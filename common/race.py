@@ -0,0 +1,243 @@
+import collections
+import dataclasses
+import json
+import os
+import pathlib
+import random
+import time
+from typing import TypeVar, Callable, Any, Optional, Iterable
+
+from common.benchmark import active_benchmark_session
+from common.construct_dir import BASE_DIR
+from common.lazy_import import lazy_import
+from common.sandbox import SandboxLimits, run_in_child
+
+multiprocessing = lazy_import('multiprocessing')
+connection = lazy_import('multiprocessing.connection')
+
+T = TypeVar('T')
+ResultType = TypeVar('ResultType')
+
+# Set to 1 to keep the race history in DEFAULT_RACE_HISTORY_PATH across runs, or to the file to keep it in
+RACE_HISTORY_ENV_VAR = 'AOC_RACE_HISTORY'
+
+DEFAULT_RACE_HISTORY_PATH = BASE_DIR / '.race_history.jsonl'
+# Once the same variant has won this many races in a row for inputs of about the same size, it's run on its own
+DEFAULT_TRUST_AFTER = 3
+# Chance that a call that would go straight to the trusted variant is raced anyway, so a variant that stops being the
+# fastest (e.g. on another day's or file's inputs of about the same size) loses its trust again
+DEFAULT_RERACE_CHANCE = 0.05
+
+
+class RaceMismatchException(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class RaceRecord:
+    race: str
+    size: Optional[int]
+    winner: str
+    # How long the winner took, including forking it
+    wall_time: float
+
+
+class RaceHistory:
+    """
+    Which variant won each race. Sizes are grouped into power of two buckets.
+
+    With a path, winners are appended to that JSON lines file as races finish, so later runs and processes racing
+    at the same time (e.g. shard workers) share one history. Without one the history is only kept in memory, so
+    each process starts out racing.
+    """
+    def __init__(self, path: Optional[str | pathlib.Path] = DEFAULT_RACE_HISTORY_PATH) -> None:
+        self._path = pathlib.Path(path) if path is not None else None
+        self._records: Optional[list[RaceRecord]] = None
+
+    @classmethod
+    def from_env(cls) -> 'RaceHistory':
+        setting = os.environ.get(RACE_HISTORY_ENV_VAR)
+        if not setting or setting == '0':
+            return cls(path=None)
+        return cls(DEFAULT_RACE_HISTORY_PATH if setting == '1' else setting)
+
+    @property
+    def records(self) -> list[RaceRecord]:
+        if self._records is None:
+            self._records = []
+            if self._path is not None and self._path.exists():
+                with open(self._path) as f:
+                    self._records = [RaceRecord(**json.loads(line)) for line in f if line.strip()]
+        return self._records
+
+    def record(self, record: RaceRecord) -> None:
+        self.records.append(record)
+        if self._path is None:
+            return
+        with open(self._path, 'a') as f:
+            # A single short write to a file opened for appending doesn't interleave with other processes' writes
+            f.write(json.dumps(dataclasses.asdict(record)) + '\n')
+
+    def trusted_winner(self, race: str, size: Optional[int], trust_after: int) -> Optional[str]:
+        """
+        Returns the variant that won each of the last trust_after races for inputs of about this size, if any
+        """
+        recent = [
+            record.winner
+            for record in self.records
+            if record.race == race and _size_bucket(record.size) == _size_bucket(size)
+        ][-trust_after:]
+        if len(recent) == trust_after and len(set(recent)) == 1:
+            return recent[0]
+        return None
+
+    def most_wins(self, race: str, size: Optional[int]) -> Optional[str]:
+        """
+        Returns the variant that won the most races for inputs of about this size, or of any size if there are none
+        """
+        wins = collections.Counter(
+            record.winner
+            for record in self.records
+            if record.race == race and _size_bucket(record.size) == _size_bucket(size)
+        ) or collections.Counter(record.winner for record in self.records if record.race == race)
+        return wins.most_common(1)[0][0] if wins else None
+
+    def format_lines(self) -> Iterable[str]:
+        wins: dict[str, dict[Optional[int], collections.Counter[str]]] = collections.defaultdict(
+            lambda: collections.defaultdict(collections.Counter)
+        )
+        for record in self.records:
+            wins[record.race][_size_bucket(record.size)][record.winner] += 1
+        for race, wins_by_bucket in sorted(wins.items()):
+            yield f'{race}:'
+            for bucket, counts in sorted(wins_by_bucket.items(), key=lambda entry: (entry[0] is not None, entry[0])):
+                size_range = f'size < {1 << bucket}' if bucket is not None else 'any size'
+                win_counts = ', '.join(f'{name} won {count}' for name, count in counts.most_common())
+                yield f'\t{size_range:<16s} {win_counts}'
+
+
+def race(
+    *variants: Callable[[T], ResultType],
+    name: Optional[str] = None,
+    size: Optional[Callable[[T], int]] = None,
+    verify: bool = False,
+    trust_after: Optional[int] = DEFAULT_TRUST_AFTER,
+    rerace_chance: float = DEFAULT_RERACE_CHANCE,
+    max_races: Optional[int] = None,
+    history: Optional[RaceHistory] = None,
+) -> Callable[[T], ResultType]:
+    """
+    Combines alternative implementations of the same solution (or item processor) into one function that runs all
+    of them at once, each in a forked child process, and returns the first result.
+
+    Without verify the slower variants are killed as soon as one finishes, with verify every variant runs to the end
+    and a RaceMismatchException is raised if their results differ. Each winner is recorded in the history along with
+    the input's size (as given by the size function), and once a variant is trusted to win at some size it's called
+    directly instead, skipping the fork. Trust isn't permanent: with a chance of rerace_chance a trusted call is
+    raced anyway, and a different winner breaks the streak that earned the trust. The history is only kept across
+    runs when one is given or AOC_RACE_HISTORY is set.
+
+    While a benchmark session is active winners aren't recorded and trusted calls are never re-raced, so every
+    benchmarked run makes the same choices as the ones before it.
+
+    Every race costs a fork per variant, which can outweigh the solving itself when there are many small inputs
+    (e.g. one per item). After max_races races in this process, calls go to the variant with the most wins at that
+    size without racing. The count is kept per process, so forked workers (e.g. a sharded StreamingSolver's) each
+    run up to max_races races of their own. Results have to be picklable.
+    """
+    race_name = name or '|'.join(variant.__name__ for variant in variants)
+    race_history = history or RaceHistory.from_env()
+    variants_by_name = {variant.__name__: variant for variant in variants}
+    races_run = 0
+
+    def pick_without_racing(data_size: Optional[int], is_benchmarking: bool) -> Optional[Callable[[T], ResultType]]:
+        if trust_after:
+            winner_name = race_history.trusted_winner(race_name, data_size, trust_after)
+            if winner_name in variants_by_name and (is_benchmarking or random.random() >= rerace_chance):
+                return variants_by_name[winner_name]
+        if max_races is not None and races_run >= max_races:
+            return variants_by_name.get(race_history.most_wins(race_name, data_size), variants[0])
+        return None
+
+    def raced(data: T) -> ResultType:
+        nonlocal races_run
+        data_size = size(data) if size else None
+        is_benchmarking = active_benchmark_session() is not None
+        if not verify:
+            variant = pick_without_racing(data_size, is_benchmarking)
+            if variant is not None:
+                return variant(data)
+
+        races_run += 1
+        winner_name, result, wall_time = _run_race(variants, data, verify)
+        if not is_benchmarking:
+            race_history.record(RaceRecord(race_name, data_size, winner_name, wall_time))
+        return result
+
+    raced.__name__ = race_name
+    raced.variants = variants
+    return raced
+
+
+def _run_race(
+    variants: tuple[Callable[[T], ResultType], ...],
+    data: T,
+    verify: bool,
+) -> tuple[str, ResultType, float]:
+    context = multiprocessing.get_context('fork')
+    start_time = time.perf_counter()
+    running = {}
+    for variant in variants:
+        receiver, sender = context.Pipe(duplex=False)
+        child = context.Process(target=run_in_child, args=(lambda v=variant: v(data), SandboxLimits(), sender))
+        child.start()
+        sender.close()
+        running[receiver] = (variant.__name__, child)
+
+    winner: Optional[tuple[str, Any, float]] = None
+    results: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    try:
+        while running and (verify or winner is None):
+            for receiver in connection.wait(list(running)):
+                variant_name, child = running.pop(receiver)
+                try:
+                    status, value, _, error = receiver.recv()
+                except EOFError:
+                    status, value, error = 'crashed', None, None
+                receiver.close()
+                child.join()
+                if status == 'crashed':
+                    error = f'exit code {child.exitcode}'
+                if status != 'ok':
+                    errors[variant_name] = error or status
+                    continue
+                results[variant_name] = value
+                if winner is None:
+                    winner = (variant_name, value, time.perf_counter() - start_time)
+    finally:
+        for receiver, (_, child) in running.items():
+            child.kill()
+            receiver.close()
+        for receiver, (_, child) in running.items():
+            child.join()
+
+    if winner is None:
+        raise RuntimeError('Every variant failed: ' + ', '.join(f'{n}: {e}' for n, e in errors.items()))
+    if verify and (errors or len(set(map(repr, results.values()))) > 1):
+        outcomes = [f'{n}={r!r}' for n, r in results.items()] + [f'{n} failed: {e}' for n, e in errors.items()]
+        raise RaceMismatchException('Variants disagree: ' + ', '.join(outcomes))
+    return winner
+
+
+def _size_bucket(size: Optional[int]) -> Optional[int]:
+    return size.bit_length() if size is not None else None
+
+
+def main() -> None:
+    for line in RaceHistory().format_lines():
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import contextlib
+import dataclasses
+import io
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+import traceback
+from typing import Optional, Iterable
+
+from common.construct_dir import BASE_DIR, day_directory
+from common.lazy_import import ImportTimer, ImportRecord
+from common.run_context import RunContext, SolutionRun
+
+
+SLOWEST_IMPORTS_SHOWN = 5
+
+
+@dataclasses.dataclass
+class DayRun:
+    day_number: int
+    wall_time: float
+    results: list[SolutionRun]
+    output: str
+    # Time spent importing modules for the first time, including any imported lazily while solving. Every day runs
+    # in a process of its own forked from the runner, so none of them gets the modules another day imported for free.
+    import_time: float
+    slowest_imports: list[ImportRecord]
+    error: Optional[str] = None
+
+
+def discover_days() -> list[int]:
+    return sorted(int(path.stem.removeprefix('day_')) for path in BASE_DIR.glob('day_[0-9][0-9]/day_[0-9][0-9].py'))
+
+
+def parse_day_ranges(spec: str) -> list[int]:
+    """
+    Parses day selections like '1-12' or '1,3,5-7'
+    """
+    days = set()
+    for part in spec.split(','):
+        first, _, last = part.strip().partition('-')
+        days.update(range(int(first), int(last or first) + 1))
+    return sorted(days)
+
+
+def run_day(day_number: int) -> DayRun:
+    """
+    Runs a day's entry point (its `if __name__ == "__main__"` block), importing it only now, and collects the
+    results its solvers record in a RunContext along with everything it printed
+    """
+    day_dir = day_directory(day_number)
+    output = io.StringIO()
+    error = None
+    start_time = time.perf_counter()
+    # Days import their own helper modules by name
+    sys.path.insert(0, str(day_dir))
+    try:
+        with RunContext() as context, ImportTimer() as import_timer, contextlib.redirect_stdout(output):
+            try:
+                runpy.run_path(str(day_dir / f'{day_dir.name}.py'), run_name='__main__')
+            except Exception:
+                error = traceback.format_exc(limit=-3)
+    finally:
+        sys.path.remove(str(day_dir))
+    return DayRun(
+        day_number=day_number,
+        wall_time=time.perf_counter() - start_time,
+        results=context.results,
+        output=output.getvalue(),
+        import_time=import_timer.total_time(),
+        slowest_imports=import_timer.slowest(SLOWEST_IMPORTS_SHOWN),
+        error=error,
+    )
+
+
+def run_days(day_numbers: list[int], jobs: int) -> list[DayRun]:
+    # Workers are forked with common already imported and replaced after each day, so every day starts out with the
+    # same modules imported however many run at once
+    with multiprocessing.get_context('fork').Pool(processes=max(1, jobs), maxtasksperchild=1) as pool:
+        return pool.map(run_day, day_numbers, chunksize=1)
+
+
+def format_table(day_runs: list[DayRun], total_wall_time: float) -> Iterable[str]:
+    rows = [('Day', 'File', 'Solution', 'Time', 'Result')]
+    for day_run in day_runs:
+        for run in day_run.results:
+            rows.append((
+                f'{day_run.day_number:02d}',
+                os.path.basename(run.file_name),
+                run.solution_name,
+                f'{run.runtime:0.3f}s',
+                run.result,
+            ))
+        status = 'FAILED' if day_run.error else ''
+        rows.append((f'{day_run.day_number:02d}', '', 'imports', f'{day_run.import_time:0.3f}s', ''))
+        rows.append((f'{day_run.day_number:02d}', '', 'total', f'{day_run.wall_time:0.3f}s', status))
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]) - 1)]
+    for row in rows:
+        yield ('  '.join(value.ljust(width) for value, width in zip(row, widths)) + '  ' + row[-1]).rstrip()
+
+    summed_wall_time = sum(day_run.wall_time for day_run in day_runs)
+    yield ''
+    yield f'Ran {len(day_runs)} days in {total_wall_time:0.2f}s ({summed_wall_time:0.2f}s if run one after another)'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Runs several days at once')
+    parser.add_argument('--days', type=parse_day_ranges, help="e.g. '1-12' or '1,3,5-7', all days by default")
+    parser.add_argument('--jobs', type=int, default=1, help='number of days to run concurrently')
+    parser.add_argument('--verbose', action='store_true', help="print each day's own output")
+    parser.add_argument('--import-times', action='store_true', help="print each day's slowest imports")
+    args = parser.parse_args()
+
+    available_days = discover_days()
+    day_numbers = [day for day in args.days if day in available_days] if args.days else available_days
+
+    start_time = time.perf_counter()
+    day_runs = run_days(day_numbers, args.jobs)
+    total_wall_time = time.perf_counter() - start_time
+
+    for day_run in day_runs:
+        if args.verbose:
+            print(f'Day {day_run.day_number:02d} output:')
+            print(day_run.output)
+        if day_run.error:
+            print(f'Day {day_run.day_number:02d} failed:\n{day_run.error}')
+        if args.import_times and day_run.slowest_imports:
+            print(f'Day {day_run.day_number:02d} slowest imports:')
+            for record in day_run.slowest_imports:
+                print(f'\t{record.cumulative_time:0.3f}s {record.name} ({record.self_time:0.3f}s excluding its imports)')
+    for line in format_table(day_runs, total_wall_time):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import contextlib
+import dataclasses
+import io
+import os
+from typing import TypeVar, Callable, TextIO, Any, Optional, Iterator
+
+from common.input_files import open_input, open_binary_input
+
+T = TypeVar('T')
+
+
+@dataclasses.dataclass
+class SolutionRun:
+    file_name: str
+    solution_name: str
+    result: str
+    runtime: float
+
+
+class RunContext:
+    """
+    Shares input between the solvers constructed in one run, e.g. `with RunContext(): ...` around a day's
+    `__main__` block.
+
+    While a context is active, each input file is read (and decompressed) once and kept in memory as text, and
+    loader results are memoized per (file, loader). Memoized results are shared between solvers, so loaders whose
+    results get mutated by a solution shouldn't be reused. Solvers also record each solution's result in it.
+
+    Entering a context while another one is active does nothing, so a day's own context defers to the one a
+    runner puts around it.
+    """
+    def __init__(self) -> None:
+        self.results: list[SolutionRun] = []
+        self._texts: dict[str, str] = {}
+        self._buffers: dict[str, bytes] = {}
+        # (file path, loader) -> (loaded value, text offset right after what the loader read)
+        self._loaded: dict[tuple[str, Callable[[TextIO], Any]], tuple[Any, int]] = {}
+        self._is_active = False
+
+    def __enter__(self) -> 'RunContext':
+        global _active_context
+        if _active_context is None:
+            _active_context = self
+            self._is_active = True
+        return _active_context
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _active_context
+        if self._is_active:
+            _active_context = None
+            self._is_active = False
+
+    def record_result(self, file_name: str, solution_name: str, result: Any, runtime: float) -> None:
+        self.results.append(SolutionRun(file_name, solution_name, str(result), runtime))
+
+    def open(self, file_name: str) -> TextIO:
+        """
+        Opens an in-memory copy of the input file, reading it from disk only the first time
+        """
+        path = os.path.abspath(file_name)
+        if path not in self._texts:
+            with open_input(file_name) as f:
+                self._texts[path] = f.read()
+        return _CachedTextFile(self._texts[path], path)
+
+    def open_buffer(self, file_name: str) -> bytes:
+        """
+        Returns the (decompressed) bytes of the input file, reading it from disk only the first time
+        """
+        path = os.path.abspath(file_name)
+        if path not in self._buffers:
+            with open_binary_input(file_name) as f:
+                self._buffers[path] = f.read()
+        return self._buffers[path]
+
+    def load(self, file_name: str, loader: Callable[[TextIO], T]) -> T:
+        with self.open(file_name) as f:
+            return self.load_prefix(f, loader)
+
+    def load_buffer(self, file_name: str, loader: Callable[[bytes], T]) -> T:
+        """
+        Like load, but for loaders that take the file's bytes
+        """
+        key = (os.path.abspath(file_name), loader)
+        if key not in self._loaded:
+            self._loaded[key] = (loader(self.open_buffer(file_name)), 0)
+        return self._loaded[key][0]
+
+    def load_prefix(self, file: TextIO, parser: Callable[[TextIO], T]) -> T:
+        """
+        Runs a parser that reads the start of the file (like a StreamingSolver's file config parser), leaving the
+        file positioned right after what it read. Only files opened through this context are memoized.
+        """
+        if not isinstance(file, _CachedTextFile):
+            return parser(file)
+
+        key = (file.path, parser)
+        if key not in self._loaded:
+            value = parser(file)
+            self._loaded[key] = (value, file.tell())
+        value, end_offset = self._loaded[key]
+        file.seek(end_offset)
+        return value
+
+
+class _CachedTextFile(io.StringIO):
+    def __init__(self, text: str, path: str) -> None:
+        # newline='' keeps the text exactly as it was decoded, the newlines were already translated when reading it
+        super().__init__(text, newline='')
+        self.path = path
+
+
+_active_context: Optional[RunContext] = None
+
+
+def active_run_context() -> Optional[RunContext]:
+    return _active_context
+
+
+@contextlib.contextmanager
+def suspended_run_context() -> Iterator[None]:
+    """
+    Deactivates the active run context (if any) until the block ends, so inputs inside it are read and parsed from
+    scratch, e.g. for every repeat of a benchmark
+    """
+    global _active_context
+    context, _active_context = _active_context, None
+    try:
+        yield
+    finally:
+        _active_context = context
@@ -0,0 +1,126 @@
+import dataclasses
+import os
+import resource
+import time
+from typing import TypeVar, Callable, Any, Optional
+
+from common.lazy_import import lazy_import
+
+multiprocessing = lazy_import('multiprocessing')
+traceback = lazy_import('traceback')
+
+T = TypeVar('T')
+
+# Seconds of wall-clock time and megabytes of address space each sandboxed solution may use
+TIMEOUT_ENV_VAR = 'AOC_TIMEOUT'
+MEMORY_LIMIT_ENV_VAR = 'AOC_MEMORY_LIMIT_MB'
+
+MB = 1 << 20
+
+
+@dataclasses.dataclass
+class SandboxLimits:
+    """
+    Limits for running a solution in a forked child process. The memory limit caps the child's address space
+    (RLIMIT_AS), which also counts memory that's mapped but never touched, so leave some headroom above the memory
+    actually needed.
+    """
+    timeout: Optional[float] = None
+    memory_bytes: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> Optional['SandboxLimits']:
+        timeout = os.environ.get(TIMEOUT_ENV_VAR)
+        memory_limit = os.environ.get(MEMORY_LIMIT_ENV_VAR)
+        if not timeout and not memory_limit:
+            return None
+        return cls(
+            timeout=float(timeout) if timeout else None,
+            memory_bytes=int(float(memory_limit) * MB) if memory_limit else None,
+        )
+
+
+@dataclasses.dataclass
+class SandboxOutcome:
+    # 'ok', 'timed out', 'out of memory', 'failed' (raised an exception) or 'crashed' (died without a result)
+    status: str
+    value: Any
+    wall_time: float
+    cpu_time: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'ok'
+
+    def describe(self) -> str:
+        """
+        Returns the value for a successful run, otherwise what went wrong
+        """
+        if self.ok:
+            return str(self.value)
+        return self.status.upper() + (f' ({self.error})' if self.error else '')
+
+
+def run_sandboxed(func: Callable[[], T], limits: SandboxLimits) -> SandboxOutcome:
+    """
+    Calls func in a forked child process under the given limits and returns how that went, rather than raising.
+
+    The child inherits everything (loaded data, closures, ...) from the parent's memory, so only the returned value
+    has to be picklable. A child that's still running when the timeout expires is killed.
+    """
+    receiver, sender = multiprocessing.get_context('fork').Pipe(duplex=False)
+    child = multiprocessing.get_context('fork').Process(target=run_in_child, args=(func, limits, sender))
+    start_time = time.perf_counter()
+    child.start()
+    # Otherwise the parent still holds the pipe open, and a crashed child would go unnoticed until the timeout
+    sender.close()
+    try:
+        if not receiver.poll(limits.timeout):
+            child.kill()
+            return SandboxOutcome('timed out', None, time.perf_counter() - start_time, error=f'{limits.timeout}s')
+        try:
+            status, value, cpu_time, error = receiver.recv()
+        except EOFError:
+            child.join()
+            return SandboxOutcome(
+                'crashed',
+                None,
+                time.perf_counter() - start_time,
+                error=f'exit code {child.exitcode}',
+            )
+        return SandboxOutcome(status, value, time.perf_counter() - start_time, cpu_time, error)
+    finally:
+        receiver.close()
+        child.join()
+
+
+def run_in_child(
+    func: Callable[[], Any],
+    limits: SandboxLimits,
+    sender: 'multiprocessing.connection.Connection',
+) -> None:
+    """
+    Target for a forked child process: applies the memory limit, calls func and sends (status, value, cpu time,
+    error) through sender, with the statuses of SandboxOutcome. Enforcing the timeout is left to the parent.
+    """
+    if limits.memory_bytes is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (limits.memory_bytes, limits.memory_bytes))
+
+    start_cpu_time = time.process_time()
+    try:
+        value = func()
+    except MemoryError:
+        # Whatever func allocated has been freed by now, so sending the outcome has memory to work with again
+        sender.send(('out of memory', None, time.process_time() - start_cpu_time, None))
+        return
+    except Exception as e:
+        error = traceback.format_exception_only(e)[-1].strip()
+        sender.send(('failed', None, time.process_time() - start_cpu_time, error))
+        return
+
+    cpu_time = time.process_time() - start_cpu_time
+    try:
+        sender.send(('ok', value, cpu_time, None))
+    except Exception as e:
+        sender.send(('failed', None, cpu_time, f'result could not be sent back: {e}'))
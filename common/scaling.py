@@ -0,0 +1,165 @@
+import dataclasses
+import math
+import os
+import random
+import runpy
+import tempfile
+from typing import Any, Optional, Sequence
+
+from common.benchmark import BenchmarkConfig, benchmark_days
+from common.construct_dir import day_directory, running_in
+
+# How far above linear (or above the baseline's exponent) a fitted exponent may be before it's flagged
+DEFAULT_EXPONENT_TOLERANCE = 0.25
+
+
+@dataclasses.dataclass
+class ScalingPoint:
+    size: int
+    median: float
+    peak_memory_bytes: Optional[int] = None
+
+
+@dataclasses.dataclass
+class ScalingCurve:
+    # Benchmark result key of the generated input, e.g. 'day_08/input_08.txt', and the solution (or 'load')
+    key: str
+    name: str
+    points: list[ScalingPoint]
+
+    @property
+    def exponent(self) -> Optional[float]:
+        """
+        Empirical complexity exponent k of runtime ~ size^k
+        """
+        return fit_exponent([(point.size, point.median) for point in self.points])
+
+    @property
+    def memory_exponent(self) -> Optional[float]:
+        return fit_exponent([
+            (point.size, point.peak_memory_bytes) for point in self.points if point.peak_memory_bytes is not None
+        ])
+
+    def format_lines(self) -> list[str]:
+        exponent = self.exponent
+        memory_exponent = self.memory_exponent
+        header = f'{self.key} {self.name}: time ~ n^' + (f'{exponent:0.2f}' if exponent is not None else '?')
+        if memory_exponent is not None:
+            header += f', memory ~ n^{memory_exponent:0.2f}'
+        lines = [header]
+        for point in self.points:
+            memory_note = (
+                f'  peak {point.peak_memory_bytes / 1024:0.1f}KB' if point.peak_memory_bytes is not None else ''
+            )
+            lines.append(f'\tn={point.size:<10d} median {point.median * 1e3:10.3f}ms{memory_note}')
+        return lines
+
+
+def fit_exponent(points: Sequence[tuple[float, float]]) -> Optional[float]:
+    """
+    Least squares slope of log(value) against log(size), None with fewer than two usable sizes
+    """
+    logs = [(math.log(size), math.log(value)) for size, value in points if size > 0 and value > 0]
+    if len({log_size for log_size, _ in logs}) < 2:
+        return None
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    return (
+        sum((x - mean_x) * (y - mean_y) for x, y in logs) /
+        sum((x - mean_x) ** 2 for x, _ in logs)
+    )
+
+
+def generate_day_input(day_number: int, size: int, seed: int = 0) -> str:
+    """
+    Calls the day's generate_input(size, rng), with an rng seeded by both seed and size
+    """
+    return _load_day_globals(day_number)['generate_input'](size, random.Random(f'{seed}/{size}'))
+
+
+def day_scaling_sizes(day_number: int) -> tuple[int, ...]:
+    """
+    The input sizes the day declares in SCALING_SIZES, picked so its slowest solution still finishes quickly
+    """
+    return _load_day_globals(day_number)['SCALING_SIZES']
+
+
+def _load_day_globals(day_number: int) -> dict[str, Any]:
+    day_dir = day_directory(day_number)
+    with running_in(day_dir):
+        return runpy.run_path(str(day_dir / f'{day_dir.name}.py'), run_name=f'{day_dir.name}_generator')
+
+
+def sweep(
+    day_number: int,
+    sizes: Optional[Sequence[int]] = None,
+    repeat: int = 3,
+    trace_memory: bool = False,
+    seed: int = 0,
+) -> tuple[list[ScalingCurve], list[str]]:
+    """
+    Benchmarks a day's solutions on generated inputs of each size in place of its input_XX.txt (the samples are
+    left out), by default the sizes the day declares. Returns a curve per (input, solution) and a description of
+    each size that failed.
+    """
+    if sizes is None:
+        sizes = day_scaling_sizes(day_number)
+    input_name = f'input_{day_number:02d}.txt'
+    config = BenchmarkConfig(warmup=1, repeat=repeat, trace_memory=trace_memory, file_pattern=input_name)
+    curves: dict[tuple[str, str], ScalingCurve] = {}
+    errors = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = os.path.join(temp_dir, input_name)
+        for size in sorted(sizes):
+            with open(input_path, 'w') as f:
+                f.write(generate_day_input(day_number, size, seed))
+
+            session, day_errors = benchmark_days([day_number], config, {input_name: input_path})
+            errors.extend(f'n={size} {error}' for error in day_errors)
+            for key, benchmark in session.results.items():
+                timings = [('load', benchmark.load, benchmark.peak_memory_bytes)]
+                timings.extend(
+                    (solution.name, solution.timing, solution.peak_memory_bytes) for solution in benchmark.solutions
+                )
+                for name, timing, peak_memory_bytes in timings:
+                    curve = curves.setdefault((key, name), ScalingCurve(key, name, []))
+                    curve.points.append(ScalingPoint(size, timing.median, peak_memory_bytes))
+    return list(curves.values()), errors
+
+
+def curves_to_json(curves: list[ScalingCurve]) -> dict[str, Any]:
+    return {
+        f'{curve.key} {curve.name}': {
+            'exponent': curve.exponent,
+            'memory_exponent': curve.memory_exponent,
+            'points': [dataclasses.asdict(point) for point in curve.points],
+        }
+        for curve in curves
+    }
+
+
+def find_scaling_regressions(
+    current: dict[str, Any],
+    baseline: Optional[dict[str, Any]] = None,
+    tolerance: float = DEFAULT_EXPONENT_TOLERANCE,
+) -> list[str]:
+    """
+    Compares results of curves_to_json, returning a description of each curve whose exponent grew by more than
+    tolerance over the baseline's. Without a baseline every super-linear curve (exponent above 1 + tolerance) is
+    returned instead.
+    """
+    regressions = []
+    for key, curve in current.items():
+        for field, label in (('exponent', 'time'), ('memory_exponent', 'memory')):
+            exponent = curve[field]
+            if exponent is None:
+                continue
+            if baseline is None:
+                if exponent > 1 + tolerance:
+                    regressions.append(f'{key}: {label} grows super-linearly, ~ n^{exponent:0.2f}')
+                continue
+
+            baseline_exponent = baseline.get(key, {}).get(field)
+            if baseline_exponent is not None and exponent > baseline_exponent + tolerance:
+                regressions.append(f'{key}: {label} ~ n^{baseline_exponent:0.2f} -> n^{exponent:0.2f}')
+    return regressions
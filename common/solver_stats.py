@@ -0,0 +1,161 @@
+import dataclasses
+from typing import Iterable, Optional
+
+
+@dataclasses.dataclass
+class LatencyHistogram:
+    # Bucket b counts latencies in [2^(b-1), 2^b) microseconds, with bucket 0 holding anything under 1us
+    bucket_counts: list[int] = dataclasses.field(default_factory=list)
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        self._add_to_bucket(int(seconds * 1_000_000).bit_length(), count)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for bucket, count in enumerate(other.bucket_counts):
+            self._add_to_bucket(bucket, count)
+
+    def _add_to_bucket(self, bucket: int, count: int) -> None:
+        if bucket >= len(self.bucket_counts):
+            self.bucket_counts.extend([0] * (bucket + 1 - len(self.bucket_counts)))
+        self.bucket_counts[bucket] += count
+
+    def total(self) -> int:
+        return sum(self.bucket_counts)
+
+    def percentile_upper_bound(self, percentile: float) -> float:
+        """
+        Returns an upper bound (in seconds) on the given percentile of the recorded latencies
+        """
+        threshold = self.total() * percentile / 100
+        seen = 0
+        for bucket, count in enumerate(self.bucket_counts):
+            seen += count
+            if count and seen >= threshold:
+                return (1 << bucket) / 1_000_000
+        return 0.0
+
+    def format_lines(self) -> Iterable[str]:
+        total = self.total()
+        for bucket, count in enumerate(self.bucket_counts):
+            if count:
+                yield f'< {_format_duration((1 << bucket) / 1_000_000):>7s}: {count:>10d} ({count / total:6.1%})'
+
+
+@dataclasses.dataclass
+class PipelineStats:
+    chunk_count: int = 0
+    max_queue_depth: int = 0
+    # Time the producer spent blocked on a full queue (consumers are the bottleneck)...
+    producer_wait_time: float = 0.0
+    # ...and time the consumer spent waiting on an empty one (reading/parsing is the bottleneck)
+    consumer_wait_time: float = 0.0
+
+    def format_line(self) -> str:
+        return (
+            f'pipeline: {self.chunk_count} chunks, max queue depth {self.max_queue_depth}, '
+            f'producer blocked {self.producer_wait_time:0.2f}s, consumer starved {self.consumer_wait_time:0.2f}s'
+        )
+
+
+@dataclasses.dataclass
+class DecompressionStats:
+    compressed_bytes: int = 0
+    decompressed_bytes: int = 0
+    # Includes reading the compressed file, which can't be told apart from decompressing it
+    decompress_time: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.decompressed_bytes / self.decompress_time if self.decompress_time else 0.0
+
+    def format_line(self) -> str:
+        return (
+            f'decompress: {_format_bytes(self.compressed_bytes)} -> {_format_bytes(self.decompressed_bytes)} '
+            f'in {self.decompress_time:0.2f}s ({_format_bytes(self.bytes_per_second)}/s)'
+        )
+
+
+@dataclasses.dataclass
+class StreamingStats:
+    file_name: str
+    solution_names: list[str]
+    item_count: int = 0
+    # Measured in characters of the item strings, which matches bytes for the ascii puzzle inputs
+    byte_count: int = 0
+    wall_time: float = 0.0
+    parse_time: float = 0.0
+    process_times: list[float] = dataclasses.field(default_factory=list)
+    # For each solution that finished early, the number of items it saw
+    done_after_items: list[Optional[int]] = dataclasses.field(default_factory=list)
+    latency: LatencyHistogram = dataclasses.field(default_factory=LatencyHistogram)
+    pipeline: Optional[PipelineStats] = None
+    decompression: Optional[DecompressionStats] = None
+
+    def __post_init__(self) -> None:
+        if not self.process_times:
+            self.process_times = [0.0] * len(self.solution_names)
+        if not self.done_after_items:
+            self.done_after_items = [None] * len(self.solution_names)
+
+    @property
+    def items_per_second(self) -> float:
+        return self.item_count / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.byte_count / self.wall_time if self.wall_time else 0.0
+
+    def process_time_by_solution(self) -> dict[str, float]:
+        return dict(zip(self.solution_names, self.process_times))
+
+    def merge(self, other: 'StreamingStats') -> None:
+        """
+        Adds in the counters of another run over a different part of the same file. Wall time is left alone,
+        since the runs may have overlapped.
+        """
+        self.item_count += other.item_count
+        self.byte_count += other.byte_count
+        self.parse_time += other.parse_time
+        self.process_times = [mine + theirs for mine, theirs in zip(self.process_times, other.process_times)]
+        self.done_after_items = [
+            mine if theirs is None else (theirs if mine is None else mine + theirs)
+            for mine, theirs in zip(self.done_after_items, other.done_after_items)
+        ]
+        self.latency.merge(other.latency)
+
+    def format_lines(self) -> Iterable[str]:
+        yield (
+            f'Stats: {self.item_count} items, {_format_bytes(self.byte_count)} in {self.wall_time:0.2f}s '
+            f'({self.items_per_second:0.0f} items/s, {_format_bytes(self.bytes_per_second)}/s)'
+        )
+        busy_time = self.parse_time + sum(self.process_times) or 1.0
+        if self.decompression:
+            yield f'\t{self.decompression.format_line()}'
+        yield f'\tparse: {self.parse_time:0.2f}s ({self.parse_time / busy_time:0.0%})'
+        for name, process_time, done_after in zip(self.solution_names, self.process_times, self.done_after_items):
+            done_note = f', done after {done_after} items' if done_after is not None else ''
+            yield f'\t{name}: {process_time:0.2f}s ({process_time / busy_time:0.0%}{done_note})'
+        yield (
+            f'\tlatency: p50 < {_format_duration(self.latency.percentile_upper_bound(50))}, '
+            f'p99 < {_format_duration(self.latency.percentile_upper_bound(99))}'
+        )
+        for line in self.latency.format_lines():
+            yield f'\t\t{line}'
+        if self.pipeline:
+            yield f'\t{self.pipeline.format_line()}'
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds >= 1:
+        return f'{seconds:0.1f}s'
+    if seconds >= 1e-3:
+        return f'{seconds * 1e3:0.0f}ms'
+    return f'{seconds * 1e6:0.0f}us'
+
+
+def _format_bytes(num_bytes: float) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if num_bytes < 1024:
+            return f'{num_bytes:0.1f}{unit}'
+        num_bytes /= 1024
+    return f'{num_bytes:0.1f}GB'
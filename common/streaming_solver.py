@@ -1,6 +1,32 @@
 import abc
+import dataclasses
+import functools
+import itertools
+import locale
+import math
+import os
+import pathlib
+import time
 from numbers import Number
-from typing import Generic, TypeVar, Callable, Type, Any, TextIO, Optional, Iterable
+from typing import Generic, TypeVar, Callable, Type, Any, TextIO, Optional, Iterable, Sequence
+
+from common.benchmark import active_benchmark_session
+from common.construct_dir import day_directory
+from common.checkpoint import CheckpointConfig, Checkpoint, save_checkpoint, load_checkpoint
+from common.input_files import find_input_file, detect_compression, open_input
+from common.item_splitter import DelimiterType, DEFAULT_CHUNK_SIZE, split_file, split_buffer, plan_shards, \
+    open_mmap, ByteOffsetTextReader, follow_text_stream, file_has_carriage_returns
+from common.iter_utils import chunked
+from common.lazy_import import lazy_import
+from common.parallel import map_with_forked_state
+from common.parse_cache import ParseCache
+from common.pipeline import BoundedProducer, ProducerModeType
+from common.profiling import SolutionProfiler
+from common.run_context import active_run_context, suspended_run_context
+from common.sandbox import SandboxLimits, run_sandboxed
+from common.solver_stats import StreamingStats, PipelineStats, DecompressionStats
+
+np = lazy_import('numpy')
 
 FileConfigType = TypeVar("FileConfigType")
 ItemDataType = TypeVar('ItemDataType')
@@ -9,6 +35,10 @@ ResultType = TypeVar('ResultType')
 
 
 class AbstractItemStreamingSolution(abc.ABC, Generic[ItemDataType, FileConfigType]):
+    # Solutions whose results form an associative fold over the items can be computed over separate shards of
+    # the input and combined afterwards with `merge`
+    is_mergeable: bool = False
+
     @abc.abstractmethod
     def __init__(self) -> None:
         ...
@@ -20,46 +50,131 @@ class AbstractItemStreamingSolution(abc.ABC, Generic[ItemDataType, FileConfigTyp
     def process_item(self, item: ItemDataType) -> None:
         ...
 
+    def process_batch(self, items: Sequence[ItemDataType]) -> None:
+        """
+        Processes several consecutive items at once. Override this when a batch can be handled more cheaply than
+        one item at a time.
+        """
+        for item in items:
+            self.process_item(item)
+
     @abc.abstractmethod
     def result(self) -> str | int:
         ...
 
+    def merge(self, partial_result: Any) -> None:
+        """
+        Folds in the result of another instance of this solution that processed a later shard of the input
+        """
+        raise NotImplementedError(f'{self.__class__.__name__} does not support merging results')
+
+    def get_state(self) -> Any:
+        """
+        Returns everything needed to pick up processing where this solution left off, for checkpointing. By default
+        that's the instance's attributes, which must then be picklable.
+        """
+        return self.__dict__
+
+    def set_state(self, state: Any) -> None:
+        """
+        Restores a state returned by get_state on a fresh instance (which already has its file config loaded)
+        """
+        self.__dict__.update(state)
+
 
 def create_summing_solution(
-    item_processor: Callable[[ItemDataType], Number]
+    item_processor: Callable[[ItemDataType], Number],
+    batch_processor: Optional[Callable[[Sequence[ItemDataType]], Number]] = None,
 ) -> Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]:
     return create_streaming_aggregating_solution(
         item_processor=lambda item, file_config: item_processor(item),
         reducer_func=lambda result, item_result: result + item_result,
         initial_result=0,
+        batch_processor=(
+            (lambda items, file_config: batch_processor(items))
+            if batch_processor
+            else (lambda items, file_config: sum(map(item_processor, items)))
+        ),
+        name=item_processor.__name__,
     )
 
 def create_summing_solution_with_file_config(
-    item_processor: Callable[[ItemDataType, FileConfigType], Number]
+    item_processor: Callable[[ItemDataType, FileConfigType], Number],
+    batch_processor: Optional[Callable[[Sequence[ItemDataType], FileConfigType], Number]] = None,
 ) -> Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]:
     return create_streaming_aggregating_solution(
         item_processor=item_processor,
         reducer_func=lambda result, item_result: result + item_result,
         initial_result=0,
+        batch_processor=batch_processor or (
+            lambda items, file_config: sum(item_processor(item, file_config) for item in items)
+        ),
+        name=item_processor.__name__,
+    )
+
+
+def create_vectorized_summing_solution(
+    array_processor: Callable[['numpy.ndarray'], 'numpy.ndarray'],
+) -> Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]:
+    """
+    Sums the outputs of a NumPy function that maps an array of items to an array of per-item outputs.
+
+    Each batch is converted to a single array and reduced at once, so use a batch_size > 1 on the solver. Batch
+    sums are converted back to python ints before being added up, so only a single batch's sum has to fit in the
+    array's dtype.
+    """
+    def _sum_batch(items: Sequence[ItemDataType]) -> Number:
+        return array_processor(np.asarray(items)).sum().item()
+
+    solution = create_summing_solution(
+        item_processor=lambda item: _sum_batch([item]),
+        batch_processor=_sum_batch,
+    )
+    solution.__name__ = solution.__qualname__ = array_processor.__name__
+    return solution
+
+def create_vectorized_summing_solution_with_file_config(
+    array_processor: Callable[['numpy.ndarray', FileConfigType], 'numpy.ndarray'],
+) -> Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]:
+    def _sum_batch(items: Sequence[ItemDataType], file_config: FileConfigType) -> Number:
+        return array_processor(np.asarray(items), file_config).sum().item()
+
+    solution = create_summing_solution_with_file_config(
+        item_processor=lambda item, file_config: _sum_batch([item], file_config),
+        batch_processor=_sum_batch,
     )
+    solution.__name__ = solution.__qualname__ = array_processor.__name__
+    return solution
 
 
 def create_product_solution(
-    item_processor: Callable[[ItemDataType], Number]
+    item_processor: Callable[[ItemDataType], Number],
+    batch_processor: Optional[Callable[[Sequence[ItemDataType]], Number]] = None,
 ) -> Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]:
     return create_streaming_aggregating_solution(
         item_processor=lambda item, file_config: item_processor(item),
         reducer_func=lambda result, item_result: result * item_result,
         initial_result=1,
+        batch_processor=(
+            (lambda items, file_config: batch_processor(items))
+            if batch_processor
+            else (lambda items, file_config: math.prod(map(item_processor, items)))
+        ),
+        name=item_processor.__name__,
     )
 
 def create_product_solution_with_file_config(
-    item_processor: Callable[[ItemDataType, FileConfigType], Number]
+    item_processor: Callable[[ItemDataType, FileConfigType], Number],
+    batch_processor: Optional[Callable[[Sequence[ItemDataType], FileConfigType], Number]] = None,
 ) -> Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]:
     return create_streaming_aggregating_solution(
         item_processor=item_processor,
         reducer_func=lambda result, item_result: result * item_result,
         initial_result=1,
+        batch_processor=batch_processor or (
+            lambda items, file_config: math.prod(item_processor(item, file_config) for item in items)
+        ),
+        name=item_processor.__name__,
     )
 
 
@@ -67,8 +182,24 @@ def create_streaming_aggregating_solution(
     item_processor: Callable[[ItemDataType, FileConfigType], ItemOutputType],
     reducer_func: Callable[[ResultType, ItemOutputType], ResultType],
     initial_result: ResultType,
+    is_associative: bool = True,
+    batch_processor: Optional[Callable[[Sequence[ItemDataType], FileConfigType], ItemOutputType]] = None,
+    name: Optional[str] = None,
 ) -> Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]:
+    """
+    Builds a solution that folds each item's output into the result with reducer_func.
+
+    When is_associative is set, reducer_func must also be able to combine two partial results (with
+    initial_result as the identity), which lets the solver compute the fold over shards in parallel. An
+    associative solution can also take a batch_processor, which computes the combined output of a whole batch of
+    items at once.
+    """
+    if batch_processor and not is_associative:
+        raise ValueError('A batch_processor can only be used with an associative reducer')
+
     class ItemStreamingSolution(AbstractItemStreamingSolution[ItemDataType, FileConfigType]):
+        is_mergeable = is_associative
+
         def __init__(self) -> None:
             self._result = initial_result
             self._config: Optional[FileConfigType] = None
@@ -79,9 +210,20 @@ def create_streaming_aggregating_solution(
         def process_item(self, item: ItemDataType) -> None:
             self._result = reducer_func(self._result, item_processor(item, self._config))
 
+        def process_batch(self, items: Sequence[ItemDataType]) -> None:
+            if batch_processor is None:
+                super().process_batch(items)
+            else:
+                self._result = reducer_func(self._result, batch_processor(items, self._config))
+
         def result(self) -> int:
             return self._result
 
+        def merge(self, partial_result: ResultType) -> None:
+            self._result = reducer_func(self._result, partial_result)
+
+    if name:
+        ItemStreamingSolution.__name__ = ItemStreamingSolution.__qualname__ = name
     return ItemStreamingSolution
 
 
@@ -89,6 +231,22 @@ class StopStreamingException(Exception):
     pass
 
 
+class StopSolutionException(Exception):
+    """
+    Raised by a solution's process_item/process_batch once it has its answer. The solver stops sending it items,
+    and stops reading the input entirely once every solution is done.
+    """
+    pass
+
+
+# More shards than workers, so a few slow shards don't leave the other workers idle
+SHARDS_PER_WORKER = 4
+
+# Parsed items are handed from the producer thread to the solutions in chunks of this many items (or batch_size
+# when batching), which keeps queue synchronization overhead off the per-item path
+PIPELINE_CHUNK_SIZE = 256
+
+
 class StreamingSolver(Generic[ItemDataType, FileConfigType]):
     def __init__(
         self,
@@ -97,14 +255,62 @@ class StreamingSolver(Generic[ItemDataType, FileConfigType]):
         solutions: list[Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
         file_config_parser: Optional[Callable[[TextIO], FileConfigType]] = None,
         log_func: Callable[[Any], None] = print,
-        item_delimiter: str | None = None,
+        item_delimiter: DelimiterType = None,
+        read_chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+        batch_size: int = 1,
+        parse_cache: Optional[ParseCache] = None,
+        pipeline_queue_size: int = 0,
+        pipeline_mode: ProducerModeType = 'thread',
+        checkpoint: Optional[CheckpointConfig] = None,
+        follow: bool = False,
+        follow_poll_interval: float = 0.5,
+        follow_report_interval: float = 5.0,
+        follow_idle_timeout: Optional[float] = None,
+        profiler: Optional[SolutionProfiler] = None,
+        base_dir: Optional[str | pathlib.Path] = None,
+        sandbox: Optional[SandboxLimits] = None,
     ) -> None:
+        # Each of these picks a different way of reading the file, none of which can be combined with the others
+        enabled_modes = [
+            option
+            for option, is_enabled in (
+                ('follow', follow),
+                ('parse_cache', parse_cache is not None),
+                ('checkpoint', checkpoint is not None),
+                ('workers > 1', workers > 1),
+                ('pipeline_queue_size > 0', pipeline_queue_size > 0),
+            )
+            if is_enabled
+        ]
+        if len(enabled_modes) > 1:
+            raise ValueError(f'Only one of these can be used at a time: {", ".join(enabled_modes)}')
+
         self._file_names = file_names
         self._item_parser = item_parser
         self._solution_classes = solutions
         self._file_config_parser = file_config_parser
         self._log_func = log_func
         self._item_delimiter = item_delimiter
+        self._read_chunk_size = read_chunk_size
+        self._workers = workers
+        self._batch_size = batch_size
+        # Cached items are stored and loaded as a single list, so every parsed item of the file is held in memory at
+        # once, on a hit as well as on a miss. Only cache files whose parsed items comfortably fit in memory.
+        self._parse_cache = parse_cache
+        self._pipeline_queue_size = pipeline_queue_size
+        self._pipeline_mode = pipeline_mode
+        self._checkpoint = checkpoint
+        self._follow = follow
+        self._follow_poll_interval = follow_poll_interval
+        self._follow_report_interval = follow_report_interval
+        self._follow_idle_timeout = follow_idle_timeout
+        # Solutions and the item parser are interleaved item by item, so each file is profiled as a whole
+        self._profiler = profiler or SolutionProfiler.from_env()
+        self._base_dir = base_dir
+        # Each sandboxed solution streams the whole file on its own, in a forked child process
+        self._sandbox = sandbox or SandboxLimits.from_env()
+        self.stats: dict[str, StreamingStats] = {}
 
     @classmethod
     def construct_for_day(
@@ -114,68 +320,645 @@ class StreamingSolver(Generic[ItemDataType, FileConfigType]):
         solutions: list[Type[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
         file_config_parser: Optional[Callable[[TextIO], FileConfigType]] = None,
         log_func: Callable[[Any], None] = print,
-        item_delimiter: str | None = None,
+        item_delimiter: DelimiterType = None,
+        read_chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+        batch_size: int = 1,
+        parse_cache: Optional[ParseCache] = None,
+        pipeline_queue_size: int = 0,
+        pipeline_mode: ProducerModeType = 'thread',
+        checkpoint: Optional[CheckpointConfig] = None,
+        follow: bool = False,
+        follow_poll_interval: float = 0.5,
+        follow_report_interval: float = 5.0,
+        follow_idle_timeout: Optional[float] = None,
+        profiler: Optional[SolutionProfiler] = None,
+        sandbox: Optional[SandboxLimits] = None,
     ) -> 'StreamingSolver[ItemDataType, FileConfigType]':
         return cls(
             file_names=[f'sample_{day_number:02d}.txt', f'input_{day_number:02d}.txt'],
+            base_dir=day_directory(day_number),
             item_parser=item_parser,
             solutions=solutions,
             file_config_parser=file_config_parser,
             log_func=log_func,
             item_delimiter=item_delimiter,
+            read_chunk_size=read_chunk_size,
+            workers=workers,
+            batch_size=batch_size,
+            parse_cache=parse_cache,
+            pipeline_queue_size=pipeline_queue_size,
+            pipeline_mode=pipeline_mode,
+            checkpoint=checkpoint,
+            follow=follow,
+            follow_poll_interval=follow_poll_interval,
+            follow_report_interval=follow_report_interval,
+            follow_idle_timeout=follow_idle_timeout,
+            profiler=profiler,
+            sandbox=sandbox,
         )
 
     def solve_all(self) -> None:
         for file_name in self._file_names:
             self.solve_file(file_name)
 
-    def solve_file(self, file_name: str) -> None:
+    def solve_file(self, file_name: str) -> StreamingStats:
+        file_name = find_input_file(file_name, self._base_dir)
+        session = active_benchmark_session()
+        if session is not None:
+            file_name = session.resolve_input(file_name)
+            return session.benchmark_streaming_solver(file_name, lambda: self._solve_from_disk(file_name))
+
         self._log_func('=' * 80)
         self._log_func(f'Solving {file_name}:')
+        if self._sandbox:
+            stats = self._solve_sandboxed(file_name)
+            self._log_func(f'Done.\n')
+            self.stats[file_name] = stats
+            return stats
+
+        if self._profiler is None:
+            solutions, stats = self._solve(file_name)
+        else:
+            solutions, stats = self._profiler.profile(
+                f'{os.path.basename(file_name)}.solve',
+                self._solve,
+                file_name,
+                log_func=self._log_func,
+            )
+
+        self._log_results(solutions)
+        context = active_run_context()
+        if context is not None:
+            for name, solution, process_time in zip(stats.solution_names, solutions, stats.process_times):
+                context.record_result(file_name, name, solution.result(), process_time)
+        for line in stats.format_lines():
+            self._log_func(f'\t{line}')
+        self._log_func(f'Done.\n')
+
+        self.stats[file_name] = stats
+        return stats
+
+    def _solve(
+        self,
+        file_name: str,
+    ) -> tuple[list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]], StreamingStats]:
         solutions = [s() for s in self._solution_classes]
+        stats = self._create_stats(file_name)
+        is_sequential_only = False
+        if self._checkpoint or self._workers > 1:
+            if detect_compression(file_name) is not None:
+                self._log_func('\tCompressed input can only be read sequentially, not checkpointing or sharding it')
+                is_sequential_only = True
+            elif file_has_carriage_returns(file_name):
+                # Checkpoints and shards split the raw bytes, which would keep the CRs a text stream drops
+                self._log_func('\tInput with CR line endings is read sequentially, not checkpointing or sharding it')
+                is_sequential_only = True
+
+        start_time = time.perf_counter()
+        if self._follow:
+            self._solve_file_following(file_name, solutions, stats)
+        elif self._parse_cache:
+            self._solve_file_with_cache(file_name, solutions, stats)
+        elif self._checkpoint and not is_sequential_only:
+            self._solve_file_checkpointed(file_name, solutions, stats)
+        elif not is_sequential_only and self._should_shard():
+            self._solve_file_sharded(file_name, solutions, stats)
+        elif self._pipeline_queue_size > 0:
+            self._solve_file_pipelined(file_name, solutions, stats)
+        else:
+            self._solve_file_serially(file_name, solutions, stats)
+        stats.wall_time = time.perf_counter() - start_time
+        return solutions, stats
+
+    def _solve_from_disk(
+        self,
+        file_name: str,
+    ) -> tuple[list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]], StreamingStats]:
+        # A run context would otherwise hand every run the same cached text and memoized file config
+        with suspended_run_context():
+            return self._solve(file_name)
+
+    def _solve_sandboxed(self, file_name: str) -> StreamingStats:
+        """
+        Solves the file once per solution, each in a forked child process under the sandbox limits, so one solution
+        timing out or running out of memory doesn't stop the others. The stats only cover the solutions that
+        finished.
+        """
+        stats = self._create_stats(file_name)
+        context = active_run_context()
+        for index, name in enumerate(stats.solution_names):
+            outcome = run_sandboxed(functools.partial(self._solve_single_solution, file_name, index), self._sandbox)
+            if outcome.ok:
+                result, solution_stats = outcome.value
+                stats.item_count = solution_stats.item_count
+                stats.byte_count = solution_stats.byte_count
+                stats.parse_time += solution_stats.parse_time
+                stats.process_times[index] = solution_stats.process_times[0]
+                stats.done_after_items[index] = solution_stats.done_after_items[0]
+            else:
+                result = outcome.describe()
+            stats.wall_time += outcome.wall_time
+            self._log_func(
+                f'\tResult for {name} (runtime={outcome.wall_time:0.2f}s, cpu={outcome.cpu_time:0.2f}s): {result}'
+            )
+            if context is not None:
+                context.record_result(file_name, name, result, outcome.wall_time)
+        return stats
+
+    def _solve_single_solution(self, file_name: str, index: int) -> tuple[str | int, StreamingStats]:
+        # Runs in a forked child, so narrowing down the solutions doesn't affect the parent's solver
+        self._solution_classes = [self._solution_classes[index]]
+        solutions, stats = self._solve(file_name)
+        return solutions[0].result(), stats
+
+    def _log_results(
+        self,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        note: str = '',
+    ) -> None:
+        for solution in solutions:
+            self._log_func(f'\tResult for {solution.__class__.__name__}{note}: {solution.result()}')
+
+    def _create_stats(self, file_name: str) -> StreamingStats:
+        names = [s.__name__ for s in self._solution_classes]
+        return StreamingStats(
+            file_name=file_name,
+            solution_names=[
+                name if names.count(name) == 1 else f'{name}[{i}]'
+                for i, name in enumerate(names)
+            ],
+        )
 
+    def _should_shard(self) -> bool:
+        if self._workers <= 1:
+            return False
+
+        unmergeable = [s.__name__ for s in self._solution_classes if not s.is_mergeable]
+        if unmergeable:
+            self._log_func(f'\tCannot merge results for {", ".join(unmergeable)}, solving with a single worker')
+            return False
+        return True
+
+    def _solve_file_serially(
+        self,
+        file_name: str,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+    ) -> None:
+        with self._open_input(file_name, stats) as f:
+            self._load_config(f, solutions, stats)
+            try:
+                self._process_items(self._stream_items_from_file(f), list(solutions), stats)
+            except StopStreamingException:
+                pass
+
+    def _solve_file_following(
+        self,
+        file_name: str,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+    ) -> None:
+        """
+        Keeps processing items as they're appended to the file, logging the current results every
+        follow_report_interval seconds in which new items arrived. Stops after follow_idle_timeout seconds without
+        new data, once every solution is done, or on Ctrl-C.
+        """
+        start_time = last_report_time = time.perf_counter()
+        reported_item_count = 0
         with open(file_name, 'r') as f:
-            if self._file_config_parser:
-                file_config = self._file_config_parser(f)
-                for solution in solutions:
-                    solution.load_config(file_config)
+            self._load_config(f, solutions, stats)
+            active_solutions = list(solutions)
+            try:
+                for items in follow_text_stream(
+                    f,
+                    self._item_delimiter,
+                    self._read_chunk_size,
+                    self._follow_poll_interval,
+                    self._follow_idle_timeout,
+                ):
+                    self._process_items(items, active_solutions, stats)
+
+                    current_time = time.perf_counter()
+                    if (
+                        current_time - last_report_time >= self._follow_report_interval
+                        and stats.item_count > reported_item_count
+                    ):
+                        self._log_results(
+                            solutions,
+                            f' after {stats.item_count} items ({current_time - start_time:0.0f}s)',
+                        )
+                        last_report_time, reported_item_count = current_time, stats.item_count
+            except StopStreamingException:
+                pass
+            except KeyboardInterrupt:
+                self._log_func('\tStopped following')
 
+    def _solve_file_pipelined(
+        self,
+        file_name: str,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+    ) -> None:
+        stats.pipeline = PipelineStats()
+        pipeline_mode = self._pipeline_mode
+        if pipeline_mode == 'process' and (os.cpu_count() or 1) < 2:
+            self._log_func('\tOnly one CPU, so parsing in another process would only add pickling, using a thread')
+            pipeline_mode = 'thread'
+        with self._open_input(file_name, stats) as f:
+            self._load_config(f, solutions, stats)
+            producer = BoundedProducer(
+                self._parse_chunks(self._stream_items_from_file(f)),
+                self._pipeline_queue_size,
+                stats.pipeline,
+                pipeline_mode,
+            )
+            active_solutions = list(solutions)
             try:
-                for item in self._stream_items_from_file(f):
-                    self._process_item(item, solutions)
+                for parsed_chunk, parse_time, byte_count in producer:
+                    stats.parse_time += parse_time
+                    stats.byte_count += byte_count
+                    self._process_parsed_items(parsed_chunk, active_solutions, stats)
             except StopStreamingException:
                 pass
+            finally:
+                producer.close()
 
-        for i, solution in enumerate(solutions):
-            result = solution.result()
-            self._log_func(f'\tResult for {solution.__class__.__name__}: {result}')
-        self._log_func(f'Done.\n')
+    def _parse_chunks(self, item_strs: Iterable[str]) -> Iterable[tuple[list[ItemDataType], float, int]]:
+        # Runs in the producer thread or process, which hands its side of the stats over along with each chunk
+        for chunk in chunked(item_strs, self._batch_size if self._batch_size > 1 else PIPELINE_CHUNK_SIZE):
+            start_time = time.perf_counter()
+            parsed_chunk = [self._item_parser(item_str) for item_str in chunk]
+            yield parsed_chunk, time.perf_counter() - start_time, sum(map(len, chunk))
+
+    def _solve_file_sharded(
+        self,
+        file_name: str,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+    ) -> None:
+        encoding = locale.getpreferredencoding(False)
+        with open(file_name, 'rb') as f:
+            reader = ByteOffsetTextReader(f, encoding)
+            file_config = self._load_config(reader, solutions, stats)
+            data_start = reader.tell()
+
+            mapped = open_mmap(reader)
+            if mapped is None:
+                return
+            with mapped:
+                shards = plan_shards(
+                    mapped,
+                    self._item_delimiter,
+                    data_start,
+                    self._workers * SHARDS_PER_WORKER,
+                    encoding,
+                )
+
+        job = _ShardJob(solver=self, file_name=file_name, encoding=encoding, file_config=file_config)
+        # Merging in shard order keeps the result identical to a serial run
+        for partial_results, shard_stats in map_with_forked_state(_solve_shard, job, shards, self._workers):
+            for solution, partial_result in zip(solutions, partial_results):
+                solution.merge(partial_result)
+            stats.merge(shard_stats)
+
+    def _solve_file_checkpointed(
+        self,
+        file_name: str,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+    ) -> None:
+        checkpoint_path = self._checkpoint.path_for(file_name)
+        encoding = locale.getpreferredencoding(False)
+        with open(file_name, 'rb') as f:
+            reader = ByteOffsetTextReader(f, encoding)
+            self._load_config(reader, solutions, stats)
+            offset = reader.tell()
+
+            mapped = open_mmap(reader)
+            if mapped is None:
+                # Nothing to checkpoint in an empty file
+                return
+
+            active_solutions: list[Optional[AbstractItemStreamingSolution]] = list(solutions)
+            if self._checkpoint.resume:
+                offset = self._resume_from_checkpoint(checkpoint_path, file_name, active_solutions, stats, offset)
+
+            with mapped:
+                last_checkpoint_items, last_checkpoint_offset = stats.item_count, offset
+                try:
+                    for window_end, items in split_buffer(
+                        mapped,
+                        self._item_delimiter,
+                        encoding,
+                        offset,
+                        window_size=self._read_chunk_size,
+                    ):
+                        self._process_items(items, active_solutions, stats)
+                        # Items are only ever cut at window boundaries, so window_end is always a clean offset to
+                        # resume from
+                        if self._checkpoint.is_due(
+                            stats.item_count - last_checkpoint_items,
+                            window_end - last_checkpoint_offset,
+                        ):
+                            self._save_checkpoint(checkpoint_path, file_name, solutions, stats, window_end)
+                            last_checkpoint_items, last_checkpoint_offset = stats.item_count, window_end
+                except StopStreamingException:
+                    pass
+
+        checkpoint_path.unlink(missing_ok=True)
+
+    def _resume_from_checkpoint(
+        self,
+        checkpoint_path: pathlib.Path,
+        file_name: str,
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        stats: StreamingStats,
+        data_start: int,
+    ) -> int:
+        checkpoint = load_checkpoint(checkpoint_path)
+        if checkpoint is None:
+            self._log_func(f'\tNo checkpoint found at {checkpoint_path}, starting from the beginning')
+            return data_start
+        if not checkpoint.matches(file_name, stats.solution_names):
+            self._log_func(f'\tCheckpoint at {checkpoint_path} is for a different input or solutions, ignoring it')
+            return data_start
+
+        for i, (state, done, done_after) in enumerate(zip(
+            checkpoint.solution_states,
+            checkpoint.solution_done,
+            checkpoint.done_after_items,
+        )):
+            # Solutions that were already done still need their state, it holds their result
+            solutions[i].set_state(state)
+            if done:
+                self._mark_solution_done(solutions, i, stats, done_after)
+        stats.item_count = checkpoint.item_count
+        self._log_func(f'\tResuming from checkpoint after {checkpoint.item_count} items (offset {checkpoint.offset})')
+        return checkpoint.offset
+
+    def _save_checkpoint(
+        self,
+        checkpoint_path: pathlib.Path,
+        file_name: str,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+        offset: int,
+    ) -> None:
+        file_stat = os.stat(file_name)
+        save_checkpoint(checkpoint_path, Checkpoint(
+            file_size=file_stat.st_size,
+            file_mtime_ns=file_stat.st_mtime_ns,
+            offset=offset,
+            item_count=stats.item_count,
+            solution_names=stats.solution_names,
+            solution_states=[solution.get_state() for solution in solutions],
+            solution_done=[done_after is not None for done_after in stats.done_after_items],
+            done_after_items=stats.done_after_items,
+        ))
+
+    def _solve_file_with_cache(
+        self,
+        file_name: str,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+    ) -> None:
+        # Caching needs every parsed item at once, so this always parses in a single process
+        start_time = time.perf_counter()
+        (file_config, parsed_items), from_cache = self._parse_cache.get_or_compute(
+            file_name,
+            [self._file_config_parser, self._item_parser],
+            lambda: self._parse_file(file_name, stats),
+            extra_key=repr(self._item_delimiter),
+        )
+        if from_cache:
+            stats.parse_time += time.perf_counter() - start_time
+            self._log_func(f'\tLoaded {len(parsed_items)} parsed items from cache')
+
+        if self._file_config_parser:
+            for solution in solutions:
+                solution.load_config(file_config)
+        try:
+            self._process_parsed_items(parsed_items, list(solutions), stats)
+        except StopStreamingException:
+            pass
+
+    def _parse_file(
+        self,
+        file_name: str,
+        stats: StreamingStats,
+    ) -> tuple[Optional[FileConfigType], list[ItemDataType]]:
+        with self._open_input(file_name, stats) as f:
+            file_config = self._load_config(f, [], stats)
+            start_time = time.perf_counter()
+            parsed_items = []
+            for item_str in self._stream_items_from_file(f):
+                parsed_items.append(self._item_parser(item_str))
+                stats.byte_count += len(item_str)
+            stats.parse_time += time.perf_counter() - start_time
+        return file_config, parsed_items
+
+    def _open_input(self, file_name: str, stats: StreamingStats) -> TextIO:
+        context = active_run_context()
+        if context is not None:
+            return context.open(file_name)
+        if detect_compression(file_name):
+            stats.decompression = DecompressionStats()
+        return open_input(file_name, stats.decompression)
+
+    def _load_config(
+        self,
+        file: TextIO,
+        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        stats: StreamingStats,
+    ) -> Optional[FileConfigType]:
+        if not self._file_config_parser:
+            return None
+
+        start_time = time.perf_counter()
+        context = active_run_context()
+        file_config = (
+            context.load_prefix(file, self._file_config_parser) if context else self._file_config_parser(file)
+        )
+        stats.parse_time += time.perf_counter() - start_time
+        for solution in solutions:
+            solution.load_config(file_config)
+        return file_config
+
+    def _stream_items_from_file(self, file: TextIO) -> Iterable[str]:
+        return split_file(file, self._item_delimiter, self._read_chunk_size)
 
-    def _stream_items_from_file(self, file: TextIO, chunk_size=256) -> Iterable[str]:
-        if self._item_delimiter is None:
-            yield from file
+    # The processing helpers below take the list of still active solutions, in which each solution that's done is
+    # replaced with None so its index (and timing slot) stays stable
+    def _process_items(
+        self,
+        item_strs: Iterable[str],
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        stats: StreamingStats,
+    ) -> None:
+        if self._batch_size <= 1:
+            for item_str in item_strs:
+                self._process_item(item_str, solutions, stats)
+            return
+
+        for batch in chunked(item_strs, self._batch_size):
+            self._process_batch(batch, solutions, stats)
+
+    def _process_parsed_items(
+        self,
+        parsed_items: Sequence[ItemDataType],
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        stats: StreamingStats,
+    ) -> None:
+        if self._batch_size <= 1:
+            for parsed_item in parsed_items:
+                start_time = time.perf_counter()
+                self._dispatch_item(parsed_item, solutions, stats, start_time, start_time)
             return
 
-        buffer = ""
-        while True:
-            chunk = file.read(chunk_size)
-            if not chunk:
-                break
+        for batch_start in range(0, len(parsed_items), self._batch_size):
+            start_time = time.perf_counter()
+            batch = parsed_items[batch_start:batch_start + self._batch_size]
+            self._dispatch_batch(batch, solutions, stats, start_time, start_time)
+
+    def _process_batch(
+        self,
+        item_strs: list[str],
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        stats: StreamingStats,
+    ) -> None:
+        start_time = time.perf_counter()
+        parsed_items = [self._item_parser(item_str) for item_str in item_strs]
+        parsed_time = time.perf_counter()
+        stats.parse_time += parsed_time - start_time
+        stats.byte_count += sum(map(len, item_strs))
 
-            buffer += chunk
-            while (pos := buffer.find(self._item_delimiter)) != -1:
-                yield buffer[:pos]
-                buffer = buffer[pos + len(self._item_delimiter):]
+        self._dispatch_batch(parsed_items, solutions, stats, start_time, parsed_time)
 
-        if buffer:
-            yield buffer
+    def _dispatch_batch(
+        self,
+        parsed_items: Sequence[ItemDataType],
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        stats: StreamingStats,
+        start_time: float,
+        last_time: float,
+    ) -> None:
+        any_solution_done = False
+        for i, solution in enumerate(solutions):
+            if solution is None:
+                continue
+            try:
+                solution.process_batch(parsed_items)
+            except StopSolutionException:
+                self._mark_solution_done(solutions, i, stats, stats.item_count + len(parsed_items))
+                any_solution_done = True
+            current_time = time.perf_counter()
+            stats.process_times[i] += current_time - last_time
+            last_time = current_time
+
+        # Individual items aren't timed within a batch, so each is assumed to take an equal share of it
+        stats.item_count += len(parsed_items)
+        stats.latency.record((last_time - start_time) / len(parsed_items), len(parsed_items))
+        if any_solution_done:
+            self._stop_if_all_solutions_done(solutions)
 
     def _process_item(
         self,
         item_str: str,
-        solutions: list[AbstractItemStreamingSolution[ItemDataType, FileConfigType]],
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        stats: StreamingStats,
     ) -> None:
+        start_time = time.perf_counter()
         parsed_item = self._item_parser(item_str)
+        parsed_time = time.perf_counter()
+        stats.parse_time += parsed_time - start_time
+        stats.byte_count += len(item_str)
 
+        self._dispatch_item(parsed_item, solutions, stats, start_time, parsed_time)
+
+    def _dispatch_item(
+        self,
+        parsed_item: ItemDataType,
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        stats: StreamingStats,
+        start_time: float,
+        last_time: float,
+    ) -> None:
+        any_solution_done = False
         for i, solution in enumerate(solutions):
-            solution.process_item(parsed_item)
+            if solution is None:
+                continue
+            try:
+                solution.process_item(parsed_item)
+            except StopSolutionException:
+                self._mark_solution_done(solutions, i, stats, stats.item_count + 1)
+                any_solution_done = True
+            current_time = time.perf_counter()
+            stats.process_times[i] += current_time - last_time
+            last_time = current_time
+
+        stats.item_count += 1
+        stats.latency.record(last_time - start_time)
+        if any_solution_done:
+            self._stop_if_all_solutions_done(solutions)
+
+    def _mark_solution_done(
+        self,
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+        index: int,
+        stats: StreamingStats,
+        items_seen: int,
+    ) -> None:
+        solutions[index] = None
+        stats.done_after_items[index] = items_seen
+
+    def _stop_if_all_solutions_done(
+        self,
+        solutions: list[Optional[AbstractItemStreamingSolution[ItemDataType, FileConfigType]]],
+    ) -> None:
+        if all(solution is None for solution in solutions):
+            raise StopStreamingException()
+
+
+@dataclasses.dataclass
+class _ShardJob(Generic[ItemDataType, FileConfigType]):
+    solver: StreamingSolver[ItemDataType, FileConfigType]
+    file_name: str
+    encoding: str
+    file_config: Optional[FileConfigType]
+
+
+def _solve_shard(
+    job: _ShardJob[ItemDataType, FileConfigType],
+    shard: tuple[int, int],
+) -> tuple[list[Any], StreamingStats]:
+    solver = job.solver
+    solutions = [s() for s in solver._solution_classes]
+    stats = solver._create_stats(job.file_name)
+    if solver._file_config_parser:
+        for solution in solutions:
+            solution.load_config(job.file_config)
+
+    start, end = shard
+    with open(job.file_name, 'rb') as f, open_mmap(f) as mapped:
+        try:
+            solver._process_items(
+                itertools.chain.from_iterable(
+                    items
+                    for _, items in split_buffer(
+                        mapped,
+                        solver._item_delimiter,
+                        job.encoding,
+                        start,
+                        end,
+                        solver._read_chunk_size,
+                    )
+                ),
+                list(solutions),
+                stats,
+            )
+        except StopStreamingException:
+            # Only stops this shard; sharded solutions are plain folds, which have no reason to stop early
+            pass
+
+    return [solution.result() for solution in solutions], stats
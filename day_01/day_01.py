@@ -1,5 +1,7 @@
+import itertools
+import random
 from types import NoneType
-from typing import Generic
+from typing import Generic, Sequence
 
 from common.streaming_solver import StreamingSolver, AbstractItemStreamingSolution
 
@@ -22,6 +24,12 @@ class Part1Solution(AbstractItemStreamingSolution[ItemDataType, FileConfigType])
         self._dial_loc = (self._dial_loc + item) % 100
         self._result += int(self._dial_loc == 0)
 
+    def process_batch(self, items: Sequence[ItemDataType]) -> None:
+        # Dial positions only matter mod 100, so the running sum can be reduced lazily
+        positions = [loc % 100 for loc in itertools.accumulate(items, initial=self._dial_loc)]
+        self._result += positions.count(0) - int(positions[0] == 0)
+        self._dial_loc = positions[-1]
+
     def result(self) -> int:
         return self._result
 
@@ -46,10 +54,20 @@ class Part2Solution(AbstractItemStreamingSolution[ItemDataType, FileConfigType])
         return self._result
 
 
+SCALING_SIZES = (1000, 2000, 4000, 8000)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates `size` dial rotations
+    """
+    return ''.join(f'{rng.choice("LR")}{rng.randint(1, 999)}\n' for _ in range(size))
+
 
 if __name__ == "__main__":
     StreamingSolver[ItemDataType, FileConfigType].construct_for_day(
         day_number=1,
         item_parser=parse_item,
         solutions=[Part1Solution, Part2Solution],
+        batch_size=1024,
     ).solve_all()
@@ -1,4 +1,6 @@
 import math
+import os
+import random
 from typing import cast, Iterable
 
 from common.streaming_solver import StreamingSolver, create_summing_solution
@@ -87,6 +89,22 @@ def _sum_arithmetic_sequence(start: int, end: int, step: int) -> int:
     return (start + end) *  num_elements // 2
 
 
+SCALING_SIZES = (1000, 2000, 4000, 8000)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates `size` non-overlapping id ranges of up to 10 digit ids
+    """
+    ranges = []
+    lo = rng.randint(1, 100)
+    for _ in range(size):
+        hi = lo + rng.randint(0, 10 ** rng.randint(1, 6))
+        ranges.append(f'{lo}-{hi}')
+        lo = hi + 1 + rng.randint(0, 10 ** 9 // size)
+    return ','.join(ranges) + '\n'
+
+
 if __name__ == "__main__":
 
     StreamingSolver[LoadedDataType, None].construct_for_day(
@@ -97,4 +115,5 @@ if __name__ == "__main__":
             create_summing_solution(solve_pt2),
         ],
         item_delimiter=',',
+        workers=os.cpu_count() or 1,
     ).solve_all()
@@ -1,4 +1,6 @@
 import math
+import os
+import random
 from collections import deque
 from operator import itemgetter
 
@@ -43,6 +45,17 @@ def _get_largest_joltage_from_bank(bank: list[int], num_batteries_to_use: int) -
         result = result * 10 + q.popleft()
     return result
 
+
+SCALING_SIZES = (1000, 2000, 4000, 8000)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates `size` banks of 100 batteries each
+    """
+    return ''.join(''.join(rng.choices('123456789', k=100)) + '\n' for _ in range(size))
+
+
 if __name__ == "__main__":
     StreamingSolver[LineDataType, None].construct_for_day(
         day_number=3,
@@ -50,5 +63,7 @@ if __name__ == "__main__":
         solutions=[
             create_summing_solution(part_one),
             create_summing_solution(part_two),
-        ]
+        ],
+        workers=os.cpu_count() or 1,
+        batch_size=1024,
     ).solve_all()
@@ -1,9 +1,14 @@
+import random
 from collections import deque
 from typing import TextIO
 from common.file_solver import FileSolver
-from common.grid import Grid, load_char_grid, ALL_DIRECTIONS, PositionType
+from common.grid import Grid, ArrayGrid, BitGrid, FlatGridIndex, load_char_grid_from_buffer, \
+    load_char_array_grid_from_buffer, ALL_DIRECTIONS, PositionType
+from common.run_context import RunContext
 
 LoadedDataType = Grid[str]
+# The vectorized solutions get the grid as an array, indexing one cell by cell is slow
+ArrayLoadedDataType = ArrayGrid[str]
 
 PAPER_ROLL_CELL = '@'
 EMPTY_CELL = '.'
@@ -24,7 +29,19 @@ def solve_pt1(grid: LoadedDataType) -> int:
             result += 1
     return result
 
+def solve_pt1_array(grid: ArrayLoadedDataType) -> int:
+    paper_rolls = grid.array == PAPER_ROLL_CELL
+    return int((paper_rolls & (grid.count_neighbors(paper_rolls) < 4)).sum())
+
+
+def solve_pt1_bits(grid: ArrayLoadedDataType) -> int:
+    paper_rolls = BitGrid.from_mask(grid.array == PAPER_ROLL_CELL)
+    return (paper_rolls & paper_rolls.neighbor_count_below(4)).count()
+
+
 def solve_pt2(grid: LoadedDataType) -> int:
+    # Rolls get marked as removed below, which other solutions given the same grid mustn't see
+    grid = grid.snapshot()
     counter_grid = Grid[int].create_empty_grid(grid.width, grid.height, default_cell_value=0)
     for grid_point, grid_value in grid.iter_points_and_values():
         if grid_value != PAPER_ROLL_CELL:
@@ -57,9 +74,61 @@ def solve_pt2(grid: LoadedDataType) -> int:
     return len(rolls_removed)
 
 
+def solve_pt2_flat(grid: ArrayLoadedDataType) -> int:
+    flat_index = FlatGridIndex(grid.height, grid.width)
+    neighbor_offsets = flat_index.offsets_by_border(ALL_DIRECTIONS)
+    borders = flat_index.borders
+    paper_rolls = grid.array == PAPER_ROLL_CELL
+    # Rolls are cleared from is_paper_roll once they're queued for removal
+    is_paper_roll = bytearray(paper_rolls.tobytes())
+    neighbor_counts = bytearray(grid.count_neighbors(paper_rolls).astype('uint8').tobytes())
+
+    q: deque[int] = deque()
+    for index in range(flat_index.size):
+        if is_paper_roll[index] and neighbor_counts[index] < 4:
+            q.append(index)
+            is_paper_roll[index] = 0
+
+    rolls_removed = 0
+    while q:
+        cur_index = q.popleft()
+        rolls_removed += 1
+        for offset in neighbor_offsets[borders[cur_index]]:
+            neighbor_index = cur_index + offset
+            neighbor_counts[neighbor_index] -= 1
+            if is_paper_roll[neighbor_index] and neighbor_counts[neighbor_index] < 4:
+                q.append(neighbor_index)
+                is_paper_roll[neighbor_index] = 0
+
+    return rolls_removed
+
+
+# The grid is size x size, so the per-cell solutions take seconds past a couple of hundred
+SCALING_SIZES = (25, 50, 100, 200)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates a `size` x `size` grid that's roughly 60% paper rolls
+    """
+    return ''.join(
+        ''.join(PAPER_ROLL_CELL if rng.random() < 0.6 else EMPTY_CELL for _ in range(size)) + '\n'
+        for _ in range(size)
+    )
+
+
 if __name__ == "__main__":
-    FileSolver[LoadedDataType].construct_for_day(
-        day_number=4,
-        loader=load_char_grid,
-        solutions=[solve_pt1, solve_pt2],
-    ).solve_all()
+    with RunContext():
+        FileSolver[LoadedDataType].construct_for_day(
+            day_number=4,
+            loader=load_char_grid_from_buffer,
+            solutions=[solve_pt1, solve_pt2],
+            buffer_input=True,
+        ).solve_all()
+
+        FileSolver[ArrayLoadedDataType].construct_for_day(
+            day_number=4,
+            loader=load_char_array_grid_from_buffer,
+            solutions=[solve_pt1_array, solve_pt1_bits, solve_pt2_flat],
+            buffer_input=True,
+        ).solve_all()
@@ -1,10 +1,17 @@
 import bisect
+import functools
 import itertools
+import random
 from collections import deque
 from typing import TextIO, Iterable, cast
 
 from common.file_solver import FileSolver
-from common.streaming_solver import StreamingSolver, AbstractItemStreamingSolution
+from common.lazy_import import lazy_import
+from common.run_context import RunContext
+from common.streaming_solver import StreamingSolver, AbstractItemStreamingSolution, \
+    create_vectorized_summing_solution_with_file_config
+
+np = lazy_import('numpy')
 
 
 def parse_ranges(file: TextIO) -> list[tuple[int, int]]:
@@ -54,6 +61,19 @@ class Part1Solution(AbstractItemStreamingSolution[int, list[tuple[int, int]]]):
         return self._count
 
 
+@functools.lru_cache(maxsize=1)
+def _flattened_range_array(ranges: tuple[tuple[int, int], ...]) -> 'numpy.ndarray':
+    return np.fromiter(itertools.chain.from_iterable(_combine_ranges(list(ranges))), dtype=np.int64)
+
+def count_fresh_ids(ids: 'numpy.ndarray', ranges: list[tuple[int, int]]) -> 'numpy.ndarray':
+    # Every batch gets the same ranges, so they're only combined once
+    flattened_ranges = _flattened_range_array(tuple(ranges))
+    idx = np.searchsorted(flattened_ranges, ids)
+    in_bounds = idx < len(flattened_ranges)
+    on_range_start = flattened_ranges[np.minimum(idx, len(flattened_ranges) - 1)] == ids
+    return in_bounds & ((idx % 2 == 1) | on_range_start)
+
+
 def solve_pt2(ranges: list[tuple[int, int]]) -> int:
     return sum ((
         hi - lo + 1
@@ -61,17 +81,37 @@ def solve_pt2(ranges: list[tuple[int, int]]) -> int:
     ))
 
 
-if __name__ == "__main__":
-    StreamingSolver[int, list[tuple[int, int]]].construct_for_day(
-        day_number=5,
-        file_config_parser=parse_ranges,
-        item_parser=parse_id,
-        solutions=[Part1Solution]
-    ).solve_all()
-
-    FileSolver[list[tuple[int, int]]].construct_for_day(
-        day_number=5,
-        loader=parse_ranges,
-        solutions=[solve_pt2],
-    ).solve_all()
+SCALING_SIZES = (1000, 2000, 4000, 8000)
 
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates `size` (possibly overlapping) fresh ingredient id ranges followed by `size` ingredient ids
+    """
+    max_id = 10 ** 12
+    ranges = []
+    for _ in range(size):
+        lo = rng.randint(1, max_id)
+        ranges.append(f'{lo}-{lo + rng.randint(0, max_id // size)}\n')
+    ids = [f'{rng.randint(1, max_id)}\n' for _ in range(size)]
+    return ''.join(ranges) + '\n' + ''.join(ids)
+
+
+if __name__ == "__main__":
+    with RunContext():
+        StreamingSolver[int, list[tuple[int, int]]].construct_for_day(
+            day_number=5,
+            file_config_parser=parse_ranges,
+            item_parser=parse_id,
+            solutions=[
+                Part1Solution,
+                create_vectorized_summing_solution_with_file_config(count_fresh_ids),
+            ],
+            batch_size=1024,
+        ).solve_all()
+
+        FileSolver[list[tuple[int, int]]].construct_for_day(
+            day_number=5,
+            loader=parse_ranges,
+            solutions=[solve_pt2],
+        ).solve_all()
@@ -1,9 +1,11 @@
 import enum
 import itertools
 import math
+import random
 from collections import deque
 from typing import TextIO, Iterable
 from common.file_solver import FileSolver
+from common.run_context import RunContext
 
 
 class Operator(enum.Enum):
@@ -53,15 +55,34 @@ def _solve_individual_problem(problem: MathProblemType) -> int:
     return sum(nums) if op == Operator.ADD else math.prod(nums)
 
 
+SCALING_SIZES = (1000, 2000, 4000, 8000)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates `size` problems of four numbers each, each problem's numbers aligned either left or right
+    """
+    rows: list[list[str]] = [[] for _ in range(5)]
+    for _ in range(size):
+        nums = [str(rng.randint(1, 9999)) for _ in range(4)]
+        width = max(map(len, nums))
+        align = str.ljust if rng.random() < 0.5 else str.rjust
+        for row, num in zip(rows, nums):
+            row.append(align(num, width))
+        rows[-1].append(rng.choice(list(Operator)).value.ljust(width))
+    return ''.join(' '.join(row) + '\n' for row in rows)
+
+
 if __name__ == "__main__":
-    FileSolver[list[MathProblemType]].construct_for_day(
-        day_number=6,
-        loader=load_pt1,
-        solutions=[solve_problems]
-    ).solve_all()
-
-    FileSolver[list[MathProblemType]].construct_for_day(
-        day_number=6,
-        loader=load_pt2,
-        solutions=[solve_problems]
-    ).solve_all()
\ No newline at end of file
+    with RunContext():
+        FileSolver[list[MathProblemType]].construct_for_day(
+            day_number=6,
+            loader=load_pt1,
+            solutions=[solve_problems]
+        ).solve_all()
+
+        FileSolver[list[MathProblemType]].construct_for_day(
+            day_number=6,
+            loader=load_pt2,
+            solutions=[solve_problems]
+        ).solve_all()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import random
 from collections import defaultdict
 from typing import TextIO
 
@@ -70,6 +71,21 @@ class Part2Solution(AbstractItemStreamingSolution[str, int]):
         return sum(self._active_column_to_timeline_count.values())
 
 
+SCALING_SIZES = (100, 200, 400, 800)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates a manifold `2 * size + 1` columns wide, with `size` rows of splitters below the start
+    """
+    width = 2 * size + 1
+    lines = [EMPTY_LOC * size + START_LOC + EMPTY_LOC * size, EMPTY_LOC * width]
+    for _ in range(size):
+        lines.append(''.join(SPLIT_LOC if rng.random() < 0.3 else EMPTY_LOC for _ in range(width)))
+        lines.append(EMPTY_LOC * width)
+    return ''.join(line + '\n' for line in lines)
+
+
 if __name__ == "__main__":
     StreamingSolver[str, int].construct_for_day(
         file_config_parser=load_start_location,
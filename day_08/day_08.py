@@ -1,16 +1,19 @@
 import itertools
 import math
+import random
 import time
 from collections import defaultdict
 from typing import TextIO, cast, Iterable
 
-import numpy as np
-from scipy.spatial import KDTree
-from sortedcontainers import SortedSet
-
 from common.file_solver import FileSolver
+from common.lazy_import import lazy_import
+from common.race import race
 import heapq
 
+np = lazy_import('numpy')
+spatial = lazy_import('scipy.spatial')
+sortedcontainers = lazy_import('sortedcontainers')
+
 JunctionPointType = tuple[int, int, int]
 LoadedDataType = tuple[int, list[JunctionPointType]]
 
@@ -35,9 +38,12 @@ def _compute_closest_connections(junctions: list[JunctionPointType]) -> list[Jun
         heapq.heappush(heap, item)
     return heap
 
-def _compute_n_closest_connections(junctions: list[JunctionPointType], n: int) -> SortedSet[JunctionDistType]:
-    closest_connections: SortedSet[JunctionDistType] = SortedSet()
-    kd_tree = KDTree(junctions)
+def _compute_n_closest_connections(
+    junctions: list[JunctionPointType],
+    n: int,
+) -> 'sortedcontainers.SortedSet[JunctionDistType]':
+    closest_connections: 'sortedcontainers.SortedSet[JunctionDistType]' = sortedcontainers.SortedSet()
+    kd_tree = spatial.KDTree(junctions)
 
     upper_bound = float('inf')
     for i, junction in enumerate(junctions):
@@ -140,13 +146,26 @@ def solve_pt2(data: LoadedDataType) -> int:
         if len(junctions) == circuits.merge(l, r):
             return l[0] * r[0]
 
+
+SCALING_SIZES = (100, 200, 400, 800)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates `size` distinct junction boxes, connecting the `size` closest pairs for part one
+    """
+    junctions: set[JunctionPointType] = set()
+    while len(junctions) < size:
+        junctions.add((rng.randrange(100_000), rng.randrange(100_000), rng.randrange(100_000)))
+    return f'{size}\n' + ''.join(f'{x},{y},{z}\n' for x, y, z in junctions)
+
+
 if __name__ == "__main__":
     FileSolver[LoadedDataType].construct_for_day(
         day_number=8,
         loader=load,
         solutions=[
-            solve_pt1,
-            solve_pt1_kd,
+            race(solve_pt1, solve_pt1_kd, size=lambda data: len(data[1])),
             solve_pt2,
         ]
     ).solve_all()
@@ -1,4 +1,5 @@
 import itertools
+import random
 from typing import TextIO, cast
 from common.file_solver import FileSolver
 
@@ -28,6 +29,32 @@ def solve_pt2(points: LoadedDataType) -> int:
     return max(area for area in shape.get_areas_for_possible_rects(points))
 
 
+SCALING_SIZES = (100, 200, 400, 800)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates a right angled polygon with about `size` vertices, shaped like a histogram of random bars and listed
+    clockwise. Vertices are at least 2 apart on both axes, since the solution rejects adjacent ones.
+    """
+    num_bars = max(1, (size - 2) // 2)
+    base = 100_000
+    x = rng.randint(1, 100)
+    heights = []
+    while len(heights) < num_bars:
+        height = rng.randint(2, base - 1)
+        if not heights or abs(height - heights[-1]) >= 2:
+            heights.append(height)
+
+    vertices = [(x, base)]
+    for height in heights:
+        vertices.append((x, base - height))
+        x += rng.randint(2, 200)
+        vertices.append((x, base - height))
+    vertices.append((x, base))
+    return ''.join(f'{x},{y}\n' for x, y in vertices)
+
+
 if __name__ == "__main__":
     FileSolver[LoadedDataType].construct_for_day(
         day_number=9,
@@ -2,13 +2,17 @@ import dataclasses
 import heapq
 import itertools
 import math
+import os
+import random
 import sys
 from collections import defaultdict
 from functools import lru_cache
 
+from common.lazy_import import lazy_import
+from common.race import race
 from common.streaming_solver import StreamingSolver, create_summing_solution
 
-import pulp as pl
+pl = lazy_import('pulp')
 
 
 @dataclasses.dataclass
@@ -123,13 +127,45 @@ def part_two_pl(data: MachineData) -> int:
     res = int(pl.value(problem.objective))
     return res
 
+
+# Solving a machine is exponential in its number of buttons
+SCALING_SIZES = (4, 5, 6, 7, 8)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates 20 machines with `size` buttons each, with light patterns and joltages reachable by pressing them
+    """
+    lines = []
+    for _ in range(20):
+        num_lights = rng.randint(3, 10)
+        buttons = [
+            sorted({i % num_lights} | set(rng.sample(range(num_lights), rng.randint(0, num_lights - 1))))
+            for i in range(size)
+        ]
+        lights = [False] * num_lights
+        joltages = [0] * num_lights
+        for button in buttons:
+            presses = rng.randint(0, 20)
+            for light in button:
+                joltages[light] += presses
+                lights[light] ^= presses % 2 == 1
+        lines.append(
+            f'[{"".join("#" if light else "." for light in lights)}] '
+            + ' '.join(f'({",".join(map(str, button))})' for button in buttons)
+            + f' {{{",".join(map(str, joltages))}}}'
+        )
+    return ''.join(line + '\n' for line in lines)
+
+
 if __name__ == "__main__":
     StreamingSolver[MachineData, None].construct_for_day(
         day_number=10,
         item_parser=parse_item,
         solutions=[
             create_summing_solution(part_one),
-            create_summing_solution(part_two),
-            create_summing_solution(part_two_pl)
-        ]
+            # Raced per machine, so the forking is bounded to the first machines each shard worker gets
+            create_summing_solution(race(part_two, part_two_pl, size=lambda data: len(data.buttons), max_races=20)),
+        ],
+        workers=os.cpu_count() or 1,
     ).solve_all()
@@ -1,4 +1,7 @@
 import dataclasses
+import math
+import random
+import string
 from functools import lru_cache
 from typing import TextIO, Iterable
 from common.file_solver import FileSolver
@@ -79,6 +82,37 @@ def solve_pt2(data: LoadedDataType) -> int:
     return _count_paths_to_end('svr').paths_with_fft_and_dac
 
 
+SCALING_SIZES = (50, 100, 200, 400)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates a layered DAG of about `size` devices. 'svr' and 'you' feed the first layer, 'fft' and 'dac' sit in
+    consecutive middle layers and every device in the last layer outputs to 'out'.
+    """
+    layer_width = max(2, math.isqrt(size))
+    num_layers = max(4, size // layer_width)
+    names: set[str] = {'svr', 'you', 'fft', 'dac', 'out'}
+    layers = []
+    for _ in range(num_layers):
+        layer = []
+        while len(layer) < layer_width:
+            name = ''.join(rng.choices(string.ascii_lowercase, k=3))
+            if name not in names:
+                names.add(name)
+                layer.append(name)
+        layers.append(layer)
+    layers[num_layers // 3][0] = 'fft'
+    layers[2 * num_layers // 3][0] = 'dac'
+
+    lines = [f'svr: {" ".join(layers[0])}', f'you: {" ".join(rng.sample(layers[0], 2))}']
+    for layer, next_layer in zip(layers, layers[1:]):
+        for device in layer:
+            lines.append(f'{device}: {" ".join(rng.sample(next_layer, min(3, len(next_layer))))}')
+    lines.extend(f'{device}: out' for device in layers[-1])
+    return ''.join(line + '\n' for line in lines)
+
+
 if __name__ == "__main__":
     FileSolver[LoadedDataType].construct_for_day(
         day_number=11,
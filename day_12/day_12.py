@@ -1,3 +1,5 @@
+import os
+import random
 from typing import TextIO
 
 from common.streaming_solver import StreamingSolver, create_summing_solution, create_summing_solution_with_file_config
@@ -45,6 +47,37 @@ def part_one(row_data: LineDataType, shape_sizes: ShapeConfig) -> int:
     raise NotImplementedError('Check this case')
 
 
+SCALING_SIZES = (1000, 2000, 4000, 8000)
+
+
+def generate_input(size: int, rng: random.Random) -> str:
+    """
+    Generates six random 3x3 presents and `size` regions, each either roomy enough to fit its presents side by side
+    or too small to hold them at all (the only cases part_one handles)
+    """
+    shape_blocks = []
+    shape_sizes = []
+    for i in range(6):
+        cells = ['#' if rng.random() < 0.7 else '.' for _ in range(9)]
+        cells[4] = '#'
+        shape_sizes.append(cells.count('#'))
+        shape_blocks.append(f'{i}:\n' + '\n'.join(''.join(cells[row * 3:row * 3 + 3]) for row in range(3)) + '\n')
+
+    regions = []
+    for _ in range(size):
+        rows, cols = rng.randint(5, 50), rng.randint(5, 50)
+        if rng.random() < 0.5:
+            counts = [0] * 6
+            for _ in range(rng.randint(0, (rows // 3) * (cols // 3))):
+                counts[rng.randrange(6)] += 1
+        else:
+            counts = [rng.randint(0, 10) for _ in range(6)]
+            while sum(count * shape_size for count, shape_size in zip(counts, shape_sizes)) <= rows * cols:
+                counts[rng.randrange(6)] += 1
+        regions.append(f'{rows}x{cols}: {" ".join(map(str, counts))}\n')
+    return '\n'.join(shape_blocks) + '---\n' + ''.join(regions)
+
+
 if __name__ == "__main__":
     StreamingSolver[LineDataType, ShapeConfig].construct_for_day(
         day_number=12,
@@ -52,5 +85,6 @@ if __name__ == "__main__":
         item_parser=parse_item,
         solutions=[
             create_summing_solution_with_file_config(part_one)
-        ]
+        ],
+        workers=os.cpu_count() or 1,
     ).solve_file('input_12.txt')
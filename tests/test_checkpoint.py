@@ -0,0 +1,67 @@
+import pathlib
+from typing import Optional
+
+import pytest
+
+from common.checkpoint import CheckpointConfig
+from common.streaming_solver import AbstractItemStreamingSolution, StopSolutionException, StreamingSolver, \
+    create_summing_solution
+
+
+class FirstOverForty(AbstractItemStreamingSolution[int, None]):
+    def __init__(self) -> None:
+        self._found: Optional[int] = None
+
+    def process_item(self, item: int) -> None:
+        if item > 40:
+            self._found = item
+            raise StopSolutionException()
+
+    def result(self) -> str | int:
+        return self._found
+
+
+def _sum_items(item: int) -> int:
+    return item
+
+
+class _Crash(Exception):
+    pass
+
+
+def _solve(path: pathlib.Path, resume: bool, crash_at: Optional[int] = None) -> dict[str, str]:
+    def parse(item_str: str) -> int:
+        item = int(item_str)
+        if item == crash_at:
+            raise _Crash()
+        return item
+
+    log_lines = []
+    solver = StreamingSolver[int, None](
+        file_names=[str(path)],
+        item_parser=parse,
+        solutions=[FirstOverForty, create_summing_solution(_sum_items)],
+        log_func=log_lines.append,
+        read_chunk_size=16,
+        checkpoint=CheckpointConfig(every_items=1, resume=resume),
+    )
+    solver.solve_file(str(path))
+    return dict(
+        line.strip().removeprefix('Result for ').split(': ')
+        for line in log_lines
+        if line.strip().startswith('Result for ')
+    )
+
+
+def test_resume_keeps_results_of_solutions_that_stopped_early(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / 'input.txt'
+    path.write_text(''.join(f'{i}\n' for i in range(1, 101)))
+
+    expected = _solve(path, resume=False)
+    assert expected == {'FirstOverForty': '41', '_sum_items': str(sum(range(1, 101)))}
+
+    with pytest.raises(_Crash):
+        _solve(path, resume=False, crash_at=80)
+    assert CheckpointConfig().path_for(str(path)).exists()
+
+    assert _solve(path, resume=True) == expected
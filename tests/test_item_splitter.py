@@ -0,0 +1,32 @@
+import pathlib
+import re
+
+import pytest
+
+from common.item_splitter import DelimiterType, split_file, split_text_stream
+
+CASES = [
+    ('1-2,3-4\n5-6,7-8\n', ','),
+    ('1-2,3-4\r\n5-6,7-8\r\n', ','),
+    ('1-2,3-4\r5-6,7-8\r', ','),
+    ('a;;;b;;c;;;;d', ';;'),
+    ('x1yy2yyy3\r\ny4', re.compile('y+')),
+    ('1\r\n2\r\n\r\n3\r\n4', '\n\n'),
+]
+
+
+@pytest.mark.parametrize('text, delimiter', CASES)
+@pytest.mark.parametrize('chunk_size', [1, 3, 1 << 16])
+def test_mmap_split_matches_stream_split(
+    tmp_path: pathlib.Path,
+    text: str,
+    delimiter: DelimiterType,
+    chunk_size: int,
+) -> None:
+    path = tmp_path / 'input.txt'
+    path.write_bytes(text.encode())
+
+    with open(path) as f:
+        expected = list(split_text_stream(f, delimiter, chunk_size))
+    with open(path) as f:
+        assert list(split_file(f, delimiter, chunk_size)) == expected